@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from api.signals import connect_signals
+        connect_signals(self.apps.get_app_config('reviews'))
@@ -0,0 +1,70 @@
+import time
+
+from api.cache import is_shared
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+USER_CLAIMS = ('username', 'role', 'is_staff')
+
+
+def get_access_token(user):
+    """Access token carrying the claims permission checks need."""
+    token = AccessToken.for_user(user)
+    token['iat'] = int(time.time())
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_user_change_key(user_id):
+    return f'auth:user-change:{user_id}'
+
+
+def get_auth_cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def record_user_change(user_id, claims=None):
+    """Remember new claims of a user, or None for a revoked user.
+
+    The record lives as long as tokens issued before the change can.
+    """
+    get_auth_cache().set(
+        get_user_change_key(user_id),
+        {'changed_at': time.time(), 'claims': claims},
+        timeout=settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
+    )
+
+
+class TokenClaimsAuthentication(JWTAuthentication):
+    """JWT authentication that builds the user from token claims.
+
+    Tokens without the claims fall back to loading the user row, and so
+    does every token while the auth cache is per-process: a change
+    recorded by one worker would go unnoticed by the others.
+    """
+
+    def get_user(self, validated_token):
+        cache = get_auth_cache()
+        if not is_shared(cache) or any(
+            claim not in validated_token for claim in USER_CLAIMS + ('iat',)
+        ):
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        claims = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        change = cache.get(get_user_change_key(user_id))
+        issued_at = validated_token['iat']
+        if change is not None and issued_at <= change['changed_at']:
+            if change['claims'] is None:
+                raise AuthenticationFailed(
+                    'Пользователь удалён или неактивен', code='user_inactive'
+                )
+            claims.update(change['claims'])
+        user = User(id=user_id, **claims)
+        user._state.adding = False
+        return user
@@ -0,0 +1,123 @@
+from api.cache import bump_version
+from api.serializers import TitleBulkSerializer
+from django.db import connection, transaction
+from django.utils import timezone
+from reviews.models import Category, Genre, GenreTitle, Title
+
+MAX_ITEMS = 1000
+TITLE_FIELDS = ('name', 'year', 'description')
+
+
+def get_slug_ids(model, slugs):
+    return dict(
+        model.objects.filter(slug__in=slugs).values_list('slug', 'id')
+    )
+
+
+def check_item(item, errors, categories, genres, titles=None):
+    if titles is not None:
+        if 'id' not in item:
+            errors['id'] = ['Обязательное поле.']
+        elif item['id'] not in titles:
+            errors['id'] = [f'Произведение {item["id"]} не найдено']
+    if 'category' in item and item['category'] not in categories:
+        errors['category'] = [f'Категория «{item["category"]}» не найдена']
+    missing = [slug for slug in item.get('genre', ()) if slug not in genres]
+    if missing:
+        errors['genre'] = [f'Жанр «{slug}» не найден' for slug in missing]
+
+
+def fill_title(title, item, categories):
+    fields = [field for field in TITLE_FIELDS if field in item]
+    for field in fields:
+        setattr(title, field, item[field])
+    if 'category' in item:
+        title.category_id = categories[item['category']]
+        fields.append('category')
+    return fields
+
+
+def create_titles(titles):
+    if connection.features.can_return_ids_from_bulk_insert:
+        Title.objects.bulk_create(titles)
+    else:
+        # Without RETURNING (SQLite on Django 2.2) the new ids are unknown.
+        for title in titles:
+            title.save()
+
+
+def update_titles(items, titles, categories):
+    """Update fields of loaded titles and drop genres being replaced."""
+    saved = [titles[item['id']] for item in items]
+    fields = set()
+    for title, item in zip(saved, items):
+        fields.update(fill_title(title, item, categories))
+    if fields:
+        # bulk_update() skips auto_now, so the change time is set here.
+        now = timezone.now()
+        for title in saved:
+            title.updated_at = now
+        fields.add('updated_at')
+        Title.objects.bulk_update(saved, sorted(fields))
+    GenreTitle.objects.filter(title__in=[
+        title for title, item in zip(saved, items) if 'genre' in item
+    ]).delete()
+    return saved
+
+
+def save_titles(data, partial=False):
+    """Create titles, or update them by id when `partial`, in one go.
+
+    Category and genre slugs of all items are resolved with one query per
+    table and rows are written with bulk operations in one transaction.
+    Returns the saved titles and None, or None and the errors: a list
+    aligned with `data` when items are invalid, in which case nothing is
+    written.
+    """
+    if not isinstance(data, list):
+        return None, {'non_field_errors': ['Ожидается список произведений']}
+    if len(data) > MAX_ITEMS:
+        return None, {'non_field_errors': [
+            f'Не больше {MAX_ITEMS} произведений за один запрос'
+        ]}
+    serializers = [
+        TitleBulkSerializer(data=item, partial=partial) for item in data
+    ]
+    errors = [
+        {} if serializer.is_valid() else dict(serializer.errors)
+        for serializer in serializers
+    ]
+    items = [serializer.validated_data for serializer in serializers]
+    categories = get_slug_ids(
+        Category, {item['category'] for item in items if 'category' in item}
+    )
+    genres = get_slug_ids(
+        Genre, {slug for item in items for slug in item.get('genre', ())}
+    )
+    titles = None
+    if partial:
+        titles = Title.objects.defer('search_vector').in_bulk(
+            [item['id'] for item in items if 'id' in item]
+        )
+    for item, item_errors in zip(items, errors):
+        if not item_errors:
+            check_item(item, item_errors, categories, genres, titles)
+    if any(errors):
+        return None, errors
+    with transaction.atomic():
+        if partial:
+            saved = update_titles(items, titles, categories)
+        else:
+            saved = [Title() for _ in items]
+            for title, item in zip(saved, items):
+                fill_title(title, item, categories)
+            create_titles(saved)
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.id, genre_id=genres[slug])
+            for title, item in zip(saved, items)
+            for slug in dict.fromkeys(item.get('genre', ()))
+        )
+        transaction.on_commit(lambda: bump_version('titles'))
+    ids = [title.id for title in saved]
+    found = Title.objects.with_related().in_bulk(ids)
+    return [found[pk] for pk in ids], None
@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+KEY_PREFIX = 'response-cache'
+# Backends whose entries other worker processes do not see.
+PROCESS_LOCAL_CACHES = (DummyCache, LocMemCache)
+
+
+def is_shared(cache):
+    return not isinstance(cache, PROCESS_LOCAL_CACHES)
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def is_enabled():
+    """Whether responses and their versions may be cached.
+
+    A version bump in a per-process cache reaches one worker only, and
+    the others would go on serving what it replaced.
+    """
+    return is_shared(get_cache())
+
+
+def get_version_key(resource):
+    return f'{KEY_PREFIX}:version:{resource}'
+
+
+def get_version(resource):
+    """Current version of a resource, started from a timestamp.
+
+    A timestamp start keeps a lost version counter from coming back to a
+    number that stale responses were stored under.
+    """
+    cache = get_cache()
+    key = get_version_key(resource)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
+    return version
+
+
+def get_written_key(resource):
+    return f'{KEY_PREFIX}:written:{resource}'
+
+
+def bump_version(*resources):
+    cache = get_cache()
+    for resource in resources:
+        key = get_version_key(resource)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    if settings.DATABASE_REPLICAS and settings.REPLICA_READ_YOUR_WRITES:
+        cache.set_many(
+            dict.fromkeys(map(get_written_key, resources), True),
+            timeout=settings.REPLICA_READ_YOUR_WRITES
+        )
+
+
+def is_recently_written(resource):
+    """Whether the replicas may still lack the last write of a resource."""
+    return bool(settings.DATABASE_REPLICAS) and get_cache().get(
+        get_written_key(resource), False
+    )
+
+
+def get_response_key(resource, path):
+    return f'{KEY_PREFIX}:json:{resource}:{get_version(resource)}:{path}'
+
+
+def count(event):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:stats:{event}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_stats():
+    cache = get_cache()
+    return {
+        event: cache.get(f'{KEY_PREFIX}:stats:{event}', 0)
+        for event in ('hits', 'misses')
+    }
@@ -0,0 +1,86 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from reviews.models import Comments, Review, Title
+
+CHUNK_SIZE = 2000
+
+EXPORT_TABLES = {
+    'titles': (Title, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('category', 'category__slug'),
+        ('description', 'description'),
+        ('rating', 'rating'),
+        ('score_count', 'score_count'),
+    )),
+    'reviews': (Review, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments': (Comments, (
+        ('id', 'id'),
+        ('review_id', 'review_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+    )),
+}
+
+
+def get_columns(table):
+    return [name for name, lookup in EXPORT_TABLES[table][1]]
+
+
+def get_rows(table, since_id=None, since=None, chunk_size=CHUNK_SIZE):
+    """Iterate table rows as dicts with a server-side cursor.
+
+    `since_id` and `since` are exclusive watermarks on id and pub_date;
+    titles have no pub_date, so only `since_id` applies to them.
+    """
+    model, columns = EXPORT_TABLES[table]
+    queryset = model.objects.order_by('id')
+    if since_id is not None:
+        queryset = queryset.filter(id__gt=since_id)
+    if since is not None and table != 'titles':
+        queryset = queryset.filter(pub_date__gt=since)
+    names = get_columns(table)
+    values = queryset.values_list(*(lookup for name, lookup in columns))
+    for row in values.iterator(chunk_size=chunk_size):
+        yield dict(zip(names, row))
+
+
+class Echo:
+    """Pseudo-buffer that returns what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def render_ndjson(table, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def render_csv(table, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(get_columns(table))
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+RENDERERS = {
+    'ndjson': (render_ndjson, 'application/x-ndjson'),
+    'csv': (render_csv, 'text/csv'),
+}
+
+
+def export(table, output='ndjson', **kwargs):
+    render, content_type = RENDERERS[output]
+    return render(table, get_rows(table, **kwargs)), content_type
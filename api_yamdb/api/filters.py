@@ -4,10 +4,16 @@ from reviews.models import Title
 
 class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(
+        field_name='category__slug'
+    )
+    genre = filters.CharFilter(
+        field_name='genre__slug'
+    )
+    category_contains = filters.CharFilter(
         field_name='category__slug',
         lookup_expr='icontains'
     )
-    genre = filters.CharFilter(
+    genre_contains = filters.CharFilter(
         field_name='genre__slug',
         lookup_expr='icontains'
     )
@@ -19,5 +25,6 @@ class TitleFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = (
-            'category', 'genre', 'name', 'year'
+            'category', 'genre', 'category_contains', 'genre_contains',
+            'name', 'year'
         )
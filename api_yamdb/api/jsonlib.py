@@ -0,0 +1,86 @@
+import json
+import uuid
+
+from django.conf import settings
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dates and dataclasses go through the DRF encoder, as with the stdlib.
+ORJSON_OPTIONS = orjson and (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
+class Fragment:
+    """Encoded JSON, for example from a cache, inserted into output as is."""
+    __slots__ = ('content',)
+
+    def __init__(self, content):
+        self.content = content
+
+
+def get_backend():
+    """'orjson' or 'json': JSON_BACKEND, where 'auto' picks orjson when it
+    is installed."""
+    if settings.JSON_BACKEND == 'auto':
+        return 'orjson' if orjson is not None else 'json'
+    return settings.JSON_BACKEND
+
+
+class Fragments:
+    """`default` hook of the encoders that puts unique placeholders in
+    place of fragments and `insert()` that swaps them for the content."""
+
+    def __init__(self):
+        self.contents = {}
+        self.encoder = encoders.JSONEncoder()
+
+    def default(self, obj):
+        if not isinstance(obj, Fragment):
+            return self.encoder.default(obj)
+        if not self.contents:
+            self.marker = uuid.uuid4().hex
+        placeholder = f'{self.marker}:{len(self.contents)}'
+        self.contents[f'"{placeholder}"'.encode()] = obj.content
+        return placeholder
+
+    def insert(self, content):
+        for placeholder, fragment in self.contents.items():
+            content = content.replace(placeholder, fragment, 1)
+        return content
+
+
+def dumps(data, indent=None, ensure_ascii=False,
+          separators=SHORT_SEPARATORS):
+    """Encode data to UTF-8 JSON bytes the way DRF's JSONRenderer does.
+
+    The compact form without ASCII escapes is encoded by orjson when the
+    backend is; other forms always use the stdlib.
+    """
+    if isinstance(data, Fragment):
+        return data.content
+    fragments = Fragments()
+    if (get_backend() == 'orjson' and indent is None and not ensure_ascii
+            and separators == SHORT_SEPARATORS):
+        content = orjson.dumps(
+            data, default=fragments.default, option=ORJSON_OPTIONS
+        )
+    else:
+        content = json.dumps(
+            data, default=fragments.default, indent=indent,
+            ensure_ascii=ensure_ascii, separators=separators,
+            allow_nan=not api_settings.STRICT_JSON
+        ).encode()
+    # Line and paragraph separators are escaped as DRF does for JSONP.
+    content = content.replace(
+        b'\xe2\x80\xa8', b'\\u2028'
+    ).replace(b'\xe2\x80\xa9', b'\\u2029')
+    return fragments.insert(content)
@@ -0,0 +1,248 @@
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+from api import cache, throttling
+from core import db
+from django.conf import settings
+
+PREFIX = 'yamdb'
+
+
+def log_linear_bounds(lowest, highest, sub_buckets=2):
+    """Bucket bounds as in HDR histograms: every power of two from
+    `lowest` to `highest` split into `sub_buckets` equal parts."""
+    bounds = []
+    exponent = math.floor(math.log2(lowest))
+    while not bounds or bounds[-1] < highest:
+        base = 2 ** exponent
+        bounds.extend(
+            base + base * step / sub_buckets
+            for step in range(1, sub_buckets + 1)
+        )
+        exponent += 1
+    return bounds
+
+
+METRICS = {
+    'request_seconds': (
+        'Wall time of a request', log_linear_bounds(0.001, 30)
+    ),
+    'db_queries': (
+        'SQL queries per request', log_linear_bounds(1, 1000)
+    ),
+    'db_seconds': (
+        'Time spent in SQL per request', log_linear_bounds(0.0001, 30)
+    ),
+    'serialize_seconds': (
+        'Time spent building and rendering the response body, without SQL',
+        log_linear_bounds(0.0001, 10)
+    ),
+    'response_bytes': (
+        'Size of the response body', log_linear_bounds(64, 64 * 2 ** 20)
+    ),
+}
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def add(self, counts, total, count):
+        """Add the state of a histogram with the same bounds."""
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.sum += total
+        self.count += count
+
+
+_histograms = {}
+_lock = threading.Lock()
+_flushed_at = 0.0
+
+
+class Sample:
+    """Measurements of one request, filled by the middleware, the
+    `execute_wrapper` of each connection, the views and the renderer."""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_seconds += time.perf_counter() - start
+
+    @contextmanager
+    def serializing(self):
+        """Add the time of the block less its SQL time, which is counted
+        on its own, to serialize_seconds."""
+        start, db_seconds = time.perf_counter(), self.db_seconds
+        try:
+            yield
+        finally:
+            self.serialize_seconds += (
+                time.perf_counter() - start - (self.db_seconds - db_seconds)
+            )
+
+
+def serializing(request):
+    """`Sample.serializing()` of a sampled request, else a no-op."""
+    sample = getattr(request, 'metrics_sample', None)
+    return nullcontext() if sample is None else sample.serializing()
+
+
+def observe(route, **values):
+    with _lock:
+        for metric, value in values.items():
+            key = (metric, route)
+            if key not in _histograms:
+                _histograms[key] = Histogram(METRICS[metric][1])
+            _histograms[key].observe(value)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def get_state():
+    """Histograms and counters of this process as JSON data."""
+    with _lock:
+        histograms = [
+            [metric, route, histogram.counts, histogram.sum, histogram.count]
+            for (metric, route), histogram in _histograms.items()
+        ]
+    return {
+        'histograms': histograms,
+        'throttle': [
+            [*key, value] for key, value in throttling.get_stats().items()
+        ],
+        'db': [[*key, value] for key, value in db.get_stats().items()],
+    }
+
+
+def get_state_path(pid):
+    return os.path.join(settings.METRICS_DIR, f'{pid}.json')
+
+
+def flush(force=False):
+    """Write the state of this process to METRICS_DIR, at most once in
+    METRICS_FLUSH_INTERVAL seconds unless forced."""
+    global _flushed_at
+    if not settings.METRICS_DIR:
+        return
+    now = time.monotonic()
+    if not force and now - _flushed_at < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _flushed_at = now
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        'w', dir=settings.METRICS_DIR, suffix='.tmp', delete=False
+    ) as file:
+        json.dump(get_state(), file)
+    # Readers see the old file or the new one, never a part of it.
+    os.replace(file.name, get_state_path(os.getpid()))
+
+
+def get_states():
+    """States of all workers: this process and the files that the other
+    ones, running or gone, left in METRICS_DIR."""
+    states = [get_state()]
+    if not settings.METRICS_DIR or not os.path.isdir(settings.METRICS_DIR):
+        return states
+    own = os.path.basename(get_state_path(os.getpid()))
+    for name in os.listdir(settings.METRICS_DIR):
+        if not name.endswith('.json') or name == own:
+            continue
+        try:
+            with open(os.path.join(settings.METRICS_DIR, name)) as file:
+                states.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return states
+
+
+def merge(states):
+    """Histograms by (metric, route) and throttle and database counters
+    summed over worker states."""
+    histograms, throttles, connections = {}, Counter(), Counter()
+    for state in states:
+        for metric, route, counts, total, count in state['histograms']:
+            if metric not in METRICS:
+                continue
+            key = (metric, route)
+            if key not in histograms:
+                histograms[key] = Histogram(METRICS[metric][1])
+            histograms[key].add(counts, total, count)
+        for scope, result, value in state['throttle']:
+            throttles[scope, result] += value
+        for alias, event, value in state['db']:
+            connections[alias, event] += value
+    return histograms, throttles, connections
+
+
+def format_value(value):
+    return f'{value:.6g}'
+
+
+def render_histogram(name, bounds, route, histogram):
+    cumulative = 0
+    for bound, count in zip(bounds + [math.inf], histogram.counts):
+        cumulative += count
+        le = '+Inf' if bound == math.inf else format_value(bound)
+        yield f'{name}_bucket{{route="{route}",le="{le}"}} {cumulative}'
+    yield f'{name}_sum{{route="{route}"}} {format_value(histogram.sum)}'
+    yield f'{name}_count{{route="{route}"}} {histogram.count}'
+
+
+def render_prometheus():
+    """Histograms and the cache, throttle and database connection
+    counters in the Prometheus text exposition format.
+
+    Without METRICS_DIR they are those of the worker that serves the
+    request; with it, the sums over all workers.
+    """
+    histograms, throttles, connections = merge(get_states())
+    lines = []
+    for metric, (help_text, bounds) in METRICS.items():
+        name = f'{PREFIX}_{metric}'
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (key, route), histogram in sorted(histograms.items()):
+            if key == metric:
+                lines.extend(render_histogram(name, bounds, route, histogram))
+    name = f'{PREFIX}_response_cache_total'
+    lines.append(f'# HELP {name} Response cache lookups')
+    lines.append(f'# TYPE {name} counter')
+    for result, value in cache.get_stats().items():
+        lines.append(f'{name}{{result="{result}"}} {value}')
+    name = f'{PREFIX}_throttle_requests_total'
+    lines.append(f'# HELP {name} Requests checked by throttles')
+    lines.append(f'# TYPE {name} counter')
+    for (scope, result), value in sorted(throttles.items()):
+        lines.append(f'{name}{{scope="{scope}",result="{result}"}} {value}')
+    name = f'{PREFIX}_db_connections_total'
+    lines.append(f'# HELP {name} Database connections by event')
+    lines.append(f'# TYPE {name} counter')
+    for (alias, event), value in sorted(connections.items()):
+        lines.append(f'{name}{{alias="{alias}",event="{event}"}} {value}')
+    return '\n'.join(lines) + '\n'
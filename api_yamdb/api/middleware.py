@@ -0,0 +1,95 @@
+import random
+import time
+from contextlib import ExitStack
+
+from api.metrics import Sample, flush, observe
+from core.routers import get_replica, read_from
+from django.conf import settings
+from django.db import connections
+
+PRIMARY_COOKIE = 'read_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class MetricsMiddleware:
+    """Record per-route latency, SQL and response size histograms.
+
+    Only METRICS_SAMPLE_RATE of requests are measured; with a rate of 0
+    the middleware just passes requests through. After every request the
+    worker state goes to METRICS_DIR, when it is set and due.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.measure(request)
+        finally:
+            flush()
+
+    def measure(self, request):
+        rate = settings.METRICS_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+        sample = request.metrics_sample = Sample()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(sample.execute)
+                )
+            response = self.get_response(request)
+        values = {
+            'request_seconds': time.perf_counter() - start,
+            'db_queries': sample.db_queries,
+            'db_seconds': sample.db_seconds,
+            'serialize_seconds': sample.serialize_seconds,
+        }
+        if not response.streaming:
+            values['response_bytes'] = len(response.content)
+        match = request.resolver_match
+        observe(match.url_name if match else 'unmatched', **values)
+        return response
+
+
+class ReplicaMiddleware:
+    """Serve the reads of safe requests from a read replica.
+
+    A successful write sets a cookie that keeps the reads of the client on
+    the primary for REPLICA_READ_YOUR_WRITES seconds, so it sees its
+    change before the replicas do. Without DATABASE_REPLICAS the
+    middleware just passes requests through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400:
+                self.set_primary_cookie(response)
+            return response
+        with read_from(None if self.reads_primary(request) else get_replica()):
+            return self.get_response(request)
+
+    def reads_primary(self, request):
+        try:
+            until = float(request.COOKIES[PRIMARY_COOKIE])
+        except (KeyError, ValueError):
+            return False
+        # The cookie is not signed, so times beyond one window are ignored.
+        return time.time() < until <= (
+            time.time() + settings.REPLICA_READ_YOUR_WRITES
+        )
+
+    def set_primary_cookie(self, response):
+        window = settings.REPLICA_READ_YOUR_WRITES
+        if window:
+            response.set_cookie(
+                PRIMARY_COOKIE, str(time.time() + window), max_age=window,
+                httponly=True, samesite='Lax'
+            )
@@ -1,4 +1,19 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from api.cache import (count, get_cache, get_response_key, get_version,
+                       is_enabled, is_recently_written)
+from api.jsonlib import Fragment
+from api.metrics import serializing
+from api.renderers import JSONRenderer
+from core.routers import read_from
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
 
 
 class ListCreateDestroyViewSet(
@@ -8,3 +23,170 @@ class ListCreateDestroyViewSet(
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class SerializeMetricsMixin:
+    """Count the time list and retrieve spend building response data, SQL
+    aside, in the serialize_seconds metric of sampled requests. Put it
+    after the cache mixins, so hits are not counted."""
+
+    def list(self, request, *args, **kwargs):
+        with serializing(request):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with serializing(request):
+            return super().retrieve(request, *args, **kwargs)
+
+
+class RowListMixin:
+    """List through `row_plan`, a `RowPlan` of the read serializer.
+
+    Pages are fetched as values() rows, which also carry the fields the
+    cursor mode orders by.
+    """
+    row_plan = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.row_plan.get_rows(
+            self.filter_queryset(self.get_queryset()),
+            *(field.lstrip('-') for field in self.cursor_ordering)
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.row_plan.serialize(page))
+        return Response(self.row_plan.serialize(queryset))
+
+
+class ResponseCacheMixin:
+    """Serve GET responses from the versioned response cache.
+
+    `cache_resource` names the version counter that writes bump in
+    `api.signals`; the full path with query params is part of the key.
+    Responses are kept as encoded JSON and go out as a `Fragment`, so a
+    hit is not decoded and encoded again. Nothing is cached unless the
+    cache is shared by the workers (`api.cache.is_enabled`).
+    """
+    cache_resource = None
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if not is_enabled():
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = get_response_key(self.cache_resource, request.get_full_path())
+        content = cache.get(key)
+        if content is not None:
+            count('hits')
+            response = Response(Fragment(content))
+            response['X-Cache'] = 'HIT'
+            return response
+        count('misses')
+        # Replicas behind a recent write would put stale data in the cache.
+        if is_recently_written(self.cache_resource):
+            with read_from(None):
+                response = handler(request, *args, **kwargs)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            # Plain JSON whatever the Accept header of this request
+            # asks for: an indent would go to every later hit.
+            content = JSONRenderer().render(
+                response.data, 'application/json', {'request': request}
+            )
+            cache.set(key, content, settings.RESPONSE_CACHE_TIMEOUT)
+            response.data = Fragment(content)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(ResponseCacheMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(ResponseCacheMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalMixin:
+    """Answer conditional GETs of unchanged lists and objects with 304.
+
+    Validators come from one aggregate query of max(updated_at) and the
+    row count; views with `cache_resource` also mix in its version, which
+    changes with related categories and genres. The count is kept in
+    `collection_count` for the paginator to reuse.
+
+    Last-Modified is only sent for objects of views without
+    `cache_resource`: max(updated_at) does not move when a row of a list
+    is deleted or a related category or genre is renamed, the ETag does.
+    Without a shared cache such views send no validators at all, since
+    the version of one worker may miss the renames done by another.
+    """
+    collection_count = None
+
+    def get_conditional_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validators(self, queryset):
+        state = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'), count=Count('pk')
+        )
+        self.collection_count = state['count']
+        seed = f'{state["last_modified"]}:{state["count"]}'
+        if getattr(self, 'cache_resource', None):
+            seed += f':{get_version(self.cache_resource)}'
+        etag = '"{}"'.format(hashlib.md5(seed.encode()).hexdigest())
+        last_modified = state['last_modified']
+        return etag, last_modified and int(last_modified.timestamp())
+
+    def get_conditional(self, handler, request, queryset, dated, *args,
+                        **kwargs):
+        if getattr(self, 'cache_resource', None) and not is_enabled():
+            return handler(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(queryset)
+        if not dated:
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalListMixin(ConditionalMixin):
+    def list(self, request, *args, **kwargs):
+        # Cursor pages skip validators, which would need a COUNT query.
+        use_cursor = getattr(self.paginator, 'use_cursor', None)
+        if use_cursor and use_cursor(request):
+            return super().list(request, *args, **kwargs)
+        return self.get_conditional(
+            super().list, request, self.get_conditional_queryset(), False,
+            *args, **kwargs
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalMixin):
+    def retrieve(self, request, *args, **kwargs):
+        # Lookups that do not fit the pk are a 404, as in get_object().
+        try:
+            queryset = self.get_conditional_queryset().filter(
+                pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        return self.get_conditional(
+            super().retrieve, request, queryset,
+            not getattr(self, 'cache_resource', None), *args, **kwargs
+        )
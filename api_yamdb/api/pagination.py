@@ -0,0 +1,49 @@
+from rest_framework import pagination
+
+
+class KeysetPagination(pagination.CursorPagination):
+    page_size_query_param = 'limit'
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+
+class LimitOffsetOrCursorPagination(pagination.LimitOffsetPagination):
+    """Limit/offset pagination with an opt-in cursor mode.
+
+    The cursor mode is selected by `?pagination=cursor` (or by a `cursor`
+    value from a previous page) and orders the queryset by the
+    `cursor_ordering` of the view without running a COUNT query. In
+    limit/offset mode the count already taken by the view for its
+    validators (`collection_count`) is reused.
+    """
+    pagination_query_param = 'pagination'
+    cursor_query_param = KeysetPagination.cursor_query_param
+    cursor_paginator = None
+    view = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        count = getattr(self.view, 'collection_count', None)
+        if count is None:
+            return super().get_count(queryset)
+        return count
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,29 @@
+from api.jsonlib import dumps
+from api.metrics import serializing
+from rest_framework import renderers
+from rest_framework.compat import (INDENT_SEPARATORS, LONG_SEPARATORS,
+                                   SHORT_SEPARATORS)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSON renderer on `api.jsonlib`: orjson when installed, fragments of
+    encoded JSON inserted as is. Adds its time to the request metrics
+    sample."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with serializing((renderer_context or {}).get('request')):
+            return self.encode(data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is None:
+            separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        else:
+            separators = INDENT_SEPARATORS
+        return dumps(
+            data, indent=indent, ensure_ascii=self.ensure_ascii,
+            separators=separators
+        )
@@ -0,0 +1,160 @@
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from rest_framework import serializers
+
+INTEGER_TYPES = ('AutoField', 'IntegerField')
+
+
+def get_converter(field, model_field):
+    """`field.to_representation`, or None where the column value is
+    already what the field would return."""
+    if isinstance(field, serializers.CharField):
+        return None
+    if isinstance(field, serializers.IntegerField) and (
+        model_field.get_internal_type().endswith(INTEGER_TYPES)
+    ):
+        return None
+    return field.to_representation
+
+
+def get_unsupported_error(field):
+    return TypeError(
+        f'{type(field).__name__} {field.field_name!r} is not supported by '
+        f'RowPlan'
+    )
+
+
+def get_value(lookup, convert):
+    if convert is None:
+        return itemgetter(lookup)
+
+    def get(row):
+        value = row[lookup]
+        return None if value is None else convert(value)
+    return get
+
+
+def get_nested(lookup, plan):
+    def get(row):
+        return None if row[lookup] is None else plan.build(row)
+    return get
+
+
+class RowPlan:
+    """Read-only ModelSerializer compiled into values() lookups.
+
+    `serialize(rows)` returns what `serializer_class(many=True).data`
+    returns for the same objects, built from `get_rows(queryset)` dicts
+    without model instances and field introspection. Plain model fields,
+    slug related fields and nested serializers are supported; nested
+    serializers with `many=True` take one query on the through table,
+    ordered by its id as the `with_related` prefetch is.
+    """
+
+    def __init__(self, serializer_class, prefix=''):
+        self.serializer_class = serializer_class
+        self.prefix = prefix
+
+    @cached_property
+    def model(self):
+        return self.serializer_class.Meta.model
+
+    @cached_property
+    def pk_lookup(self):
+        return self.prefix + self.model._meta.pk.attname
+
+    @cached_property
+    def compiled(self):
+        """Output fields as (name, getter) and the values() lookups.
+
+        Getters of `many` fields are None: their values come from
+        `get_many()` per batch of rows.
+        """
+        fields, lookups, many = [], {self.pk_lookup: None}, {}
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            getter, field_lookups = self.compile_field(field)
+            if getter is None:
+                many[name] = field_lookups
+                field_lookups = ()
+            fields.append((name, getter))
+            lookups.update(dict.fromkeys(field_lookups))
+        return tuple(fields), tuple(lookups), many
+
+    def compile_field(self, field):
+        try:
+            model_field = self.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise get_unsupported_error(field)
+        lookup = self.prefix + field.source
+        if isinstance(field, serializers.ListSerializer):
+            through = model_field.remote_field.through
+            return None, (
+                model_field.m2m_field_name(),
+                RowPlan(
+                    type(field.child),
+                    f'{model_field.m2m_reverse_field_name()}__'
+                ),
+                through
+            )
+        if isinstance(field, serializers.ModelSerializer):
+            plan = RowPlan(type(field), f'{lookup}__')
+            return (
+                get_nested(self.prefix + model_field.attname, plan),
+                (self.prefix + model_field.attname, *plan.lookups)
+            )
+        if isinstance(field, serializers.SlugRelatedField):
+            related_pk = model_field.related_model._meta.pk
+            if field.slug_field in ('pk', related_pk.name):
+                lookup = self.prefix + model_field.attname
+            else:
+                lookup = f'{lookup}__{field.slug_field}'
+            return get_value(lookup, None), (lookup,)
+        if model_field.is_relation:
+            raise get_unsupported_error(field)
+        return get_value(lookup, get_converter(field, model_field)), (lookup,)
+
+    @property
+    def lookups(self):
+        return self.compiled[1]
+
+    def get_rows(self, queryset, *lookups):
+        """Row dicts of the queryset; `lookups` adds columns such as the
+        ones a cursor paginator orders by."""
+        return queryset.prefetch_related(None).values(
+            *dict.fromkeys(self.lookups + lookups)
+        )
+
+    def get_many(self, rows):
+        many = self.compiled[2]
+        if not many:
+            return {}
+        pks = [row[self.pk_lookup] for row in rows]
+        return {
+            name: self.get_related(pks, *spec) for name, spec in many.items()
+        }
+
+    def get_related(self, pks, parent, plan, through):
+        """Built related items by parent pk, from the through table."""
+        related = {}
+        for row in through.objects.filter(
+            **{f'{parent}__in': pks}
+        ).order_by('pk').values(parent, *plan.lookups):
+            related.setdefault(row[parent], []).append(plan.build(row))
+        return related
+
+    def build(self, row, related=None):
+        return {
+            name: get(row) if get is not None
+            else related[name].get(row[self.pk_lookup], [])
+            for name, get in self.compiled[0]
+        }
+
+    def serialize(self, rows):
+        rows = list(rows)
+        related = self.get_many(rows)
+        build = self.build
+        return [build(row, related) for row in rows]
@@ -0,0 +1,148 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Func, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat
+from reviews.models import Review, Title
+
+SEARCH_CONFIG = 'russian'
+HIGHLIGHT_START = '<b>'
+HIGHLIGHT_STOP = '</b>'
+
+FTS_TABLES = {
+    'reviews_title': ('name', 'description'),
+    'reviews_review': ('text',),
+}
+
+
+class Headline(Func):
+    function = 'ts_headline'
+    template = (
+        f"%(function)s('{SEARCH_CONFIG}', %(expressions)s, "
+        f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}')"
+    )
+    output_field = TextField()
+
+
+class PostgresSearch:
+    """Ranked search over the trigger-maintained `search_vector` columns."""
+
+    def get_query(self, text):
+        return SearchQuery(text, config=SEARCH_CONFIG)
+
+    def titles(self, text):
+        query = self.get_query(text)
+        return Title.objects.with_related().filter(
+            search_vector=query
+        ).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=Headline(
+                Concat('name', Value('. '), 'description'), query
+            ),
+        ).order_by('-rank', 'id')
+
+    def reviews(self, text):
+        query = self.get_query(text)
+        return Review.objects.select_related('author').defer(
+            'search_vector'
+        ).filter(
+            search_vector=query
+        ).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=Headline(F('text'), query),
+        ).order_by('-rank', 'id')
+
+
+class SQLiteSearch:
+    """Ranked search over FTS5 tables, for local runs and tests."""
+
+    def get_match(self, text):
+        # Prefix terms stand in for the stemming Postgres does.
+        return ' '.join(
+            '"{}"*'.format(word.replace('"', '""')) for word in text.split()
+        )
+
+    def search(self, queryset, table, text, weights):
+        match = self.get_match(text)
+        fts = f'{table}_fts'
+        where = f'{fts} MATCH %s AND {fts}.rowid = {table}.id'
+        # RawSQL in an __in lookup gets wrapped into a scalar subquery on
+        # SQLite, so the matching ids are filtered with extra() instead.
+        return queryset.extra(
+            where=[f'{table}.id IN (SELECT rowid FROM {fts} '
+                   f'WHERE {fts} MATCH %s)'],
+            params=(match,)
+        ).annotate(
+            rank=RawSQL(
+                f'SELECT -bm25({fts}, {weights}) FROM {fts} WHERE {where}',
+                (match,)
+            ),
+            headline=RawSQL(
+                f"SELECT snippet({fts}, -1, '{HIGHLIGHT_START}', "
+                f"'{HIGHLIGHT_STOP}', '…', 16) FROM {fts} WHERE {where}",
+                (match,)
+            ),
+        ).order_by('-rank', 'id')
+
+    def titles(self, text):
+        return self.search(
+            Title.objects.with_related(), 'reviews_title', text, '10.0, 1.0'
+        )
+
+    def reviews(self, text):
+        return self.search(
+            Review.objects.select_related('author').defer('search_vector'),
+            'reviews_review', text, '1.0'
+        )
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresSearch(),
+    'sqlite': SQLiteSearch(),
+}
+
+
+def get_search_backend(using='default'):
+    return SEARCH_BACKENDS[connections[using].vendor]
+
+
+def create_fts_tables(using='default', **kwargs):
+    """Create SQLite FTS5 tables and the triggers that keep them in sync.
+
+    Runs after every migrate, since SQLite drops triggers whenever a
+    migration rebuilds the underlying table.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for table, columns in FTS_TABLES.items():
+            fts = f'{table}_fts'
+            names = ', '.join(columns)
+            new = ', '.join(f'new.{column}' for column in columns)
+            old = ', '.join(f'old.{column}' for column in columns)
+            insert = (
+                f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});'
+            )
+            delete = (
+                f"INSERT INTO {fts}({fts}, rowid, {names}) "
+                f"VALUES ('delete', old.id, {old});"
+            )
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5('
+                f"{names}, content='{table}', content_rowid='id')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_insert '
+                f'AFTER INSERT ON {table} BEGIN {insert} END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_delete '
+                f'AFTER DELETE ON {table} BEGIN {delete} END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_update '
+                f'AFTER UPDATE OF {names} ON {table} '
+                f'BEGIN {delete} {insert} END'
+            )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
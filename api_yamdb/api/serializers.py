@@ -1,8 +1,14 @@
+from api.export import RENDERERS
+from api.stats import get_median, get_weighted_rating
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
 from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
-from reviews.models import Category, Comments, Genre, Review, Title, User
+from rest_framework.settings import api_settings
+from reviews.models import (Category, Comments, Genre, LeaderboardEntry,
+                            Review, Title, User)
 
 USER = 'user'
 MODERATOR = 'moderator'
@@ -15,6 +21,19 @@ ROLES = (
 )
 
 
+def is_duplicate_review(error):
+    """Whether an IntegrityError comes from the unique_title_author
+    constraint: PostgreSQL names it, SQLite lists its columns."""
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        return diag.constraint_name == 'unique_title_author'
+    table = Review._meta.db_table
+    return (
+        f'UNIQUE constraint failed: {table}.title_id, {table}.author_id'
+        in str(error)
+    )
+
+
 class UserSerializer(serializers.ModelSerializer):
 
     role = serializers.ChoiceField(choices=ROLES, default='user')
@@ -48,18 +67,10 @@ class UserSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class TokenSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = (
-            'confirmation_code',
-            'username'
-        )
-        extra_kwargs = {
-            'username': {
-                'validators': []
-            }
-        }
+class TokenSerializer(serializers.Serializer):
+    """Token request check that does not touch the database."""
+    username = serializers.CharField(max_length=150)
+    confirmation_code = serializers.CharField(max_length=10)
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -89,18 +100,31 @@ class ReviewSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(
                     'Параметр "score" должен быть в пределах от 1 до 10!'
                 )
-        title_id = self.context['view'].kwargs.get('title_id')
-        author = self.context['request'].user
-        if (Review.objects.filter(
-                title=get_object_or_404(Title, pk=title_id),
-                author=author
-        )
-                and self.context['request'].method == 'POST'):
-            raise serializers.ValidationError(
-                'Объект с такими параметрами уже существует!'
-            )
         return attrs
 
+    def create(self, validated_data):
+        # One review per title and author is left to the
+        # unique_title_author constraint: no SELECT before the INSERT and
+        # no race between concurrent requests.
+        try:
+            return super().create(validated_data)
+        except IntegrityError as error:
+            if not is_duplicate_review(error):
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Объект с такими параметрами уже существует!'
+                ]
+            })
+
+
+class ReviewSearchSerializer(ReviewSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('rank', 'headline')
+
 
 class CommentsSerializer(serializers.ModelSerializer):
     review = serializers.SlugRelatedField(
@@ -136,9 +160,7 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitleReadSerializer(serializers.ModelSerializer):
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         fields = ('id', 'name', 'year', 'rating',
@@ -153,6 +175,14 @@ class TitleReadSerializer(serializers.ModelSerializer):
             )
 
 
+class TitleSearchSerializer(TitleReadSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('rank', 'headline')
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         slug_field='slug', many=True, queryset=Genre.objects.all()
@@ -165,6 +195,84 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
 
+    @cached_property
+    def read_serializer(self):
+        # One per serializer: a list reuses it for all of its titles.
+        return TitleReadSerializer(context=self.context)
+
     def to_representation(self, instance):
-        serializer = TitleReadSerializer(instance)
-        return serializer.data
+        return self.read_serializer.to_representation(instance)
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField(source='score_count')
+    mean = serializers.FloatField(source='rating')
+    median = serializers.SerializerMethodField()
+    weighted_rating = serializers.SerializerMethodField()
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('id', 'count', 'mean', 'median', 'weighted_rating',
+                  'histogram')
+        model = Title
+
+    def get_histogram(self, obj):
+        return {
+            str(score): count for score, count in obj.get_histogram().items()
+        }
+
+    def get_median(self, obj):
+        return get_median(obj.get_histogram())
+
+    def get_weighted_rating(self, obj):
+        return get_weighted_rating(obj.score_sum, obj.score_count)
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Item of a bulk title write; slugs are resolved in `api.bulk`."""
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+        model = Title
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    output = serializers.ChoiceField(
+        choices=tuple(RENDERERS), default='ndjson'
+    )
+    since_id = serializers.IntegerField(required=False, min_value=0)
+    since = serializers.DateTimeField(required=False)
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    title = TitleReadSerializer(read_only=True)
+
+    class Meta:
+        fields = ('rank', 'score', 'title')
+        model = LeaderboardEntry
+
+
+class LeaderboardParamsSerializer(serializers.Serializer):
+    category = serializers.SlugField(default='')
+    genre = serializers.SlugField(default='')
+    offset = serializers.IntegerField(default=0, min_value=0)
+    limit = serializers.IntegerField(
+        default=10, min_value=1, max_value=settings.LEADERBOARD_SIZE
+    )
+
+    def validate(self, attrs):
+        if attrs['category'] and attrs['genre']:
+            raise serializers.ValidationError(
+                'Рейтинг строится по категории или по жанру, не по обоим'
+            )
+        return attrs
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    scope = serializers.ChoiceField(
+        choices=('titles', 'reviews'), default='titles'
+    )
@@ -0,0 +1,61 @@
+from api.authentication import USER_CLAIMS, record_user_change
+from api.cache import bump_version
+from api.search import create_fts_tables
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from reviews.models import Category, Genre, GenreTitle, Review, Title, User
+
+CACHE_DEPENDENCIES = {
+    Category: ('categories', 'titles'),
+    Genre: ('genres', 'titles'),
+    Title: ('titles',),
+    GenreTitle: ('titles',),
+    Review: ('titles',),
+}
+
+
+def invalidate_response_cache(sender, **kwargs):
+    resources = CACHE_DEPENDENCIES[sender]
+    transaction.on_commit(lambda: bump_version(*resources))
+
+
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_response_cache(GenreTitle)
+
+
+def update_title_rating(sender, instance, created=False, **kwargs):
+    """Move the rating aggregates and score histogram of the title with
+    every saved or deleted review, cascade deletes of users and titles
+    included. Bulk inserts and updates need `rebuild_ratings`."""
+    if kwargs.get('signal') is post_delete:
+        score = None
+    else:
+        score = instance.score
+    if created or instance.stored_score is not None:
+        Title.update_rating(instance.title_id, instance.stored_score, score)
+    instance.stored_score = score
+
+
+def record_user_claims(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    if kwargs.get('signal') is post_delete or not instance.is_active:
+        record_user_change(instance.pk)
+    else:
+        record_user_change(instance.pk, {
+            claim: getattr(instance, claim) for claim in USER_CLAIMS
+        })
+
+
+def connect_signals(reviews_config):
+    for model in CACHE_DEPENDENCIES:
+        post_save.connect(invalidate_response_cache, sender=model)
+        post_delete.connect(invalidate_response_cache, sender=model)
+    post_save.connect(update_title_rating, sender=Review)
+    post_delete.connect(update_title_rating, sender=Review)
+    m2m_changed.connect(invalidate_title_genres, sender=Title.genre.through)
+    post_save.connect(record_user_claims, sender=User)
+    post_delete.connect(record_user_claims, sender=User)
+    post_migrate.connect(create_fts_tables, sender=reviews_config)
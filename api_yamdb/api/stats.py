@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from reviews.models import Title
+
+PRIOR_MEAN_KEY = 'ratings:prior-mean'
+
+
+def get_nth_score(histogram, index):
+    for score, count in histogram.items():
+        if index < count:
+            return score
+        index -= count
+    return None
+
+
+def get_median(histogram):
+    count = sum(histogram.values())
+    if not count:
+        return None
+    return (
+        get_nth_score(histogram, (count - 1) // 2)
+        + get_nth_score(histogram, count // 2)
+    ) / 2
+
+
+def get_prior_mean():
+    """Mean score over all reviews, recalculated from the stored title
+    aggregates at most once per RATING_PRIOR_TIMEOUT."""
+    cached = cache.get(PRIOR_MEAN_KEY)
+    if cached is None:
+        totals = Title.objects.aggregate(
+            score_sum=Sum('score_sum'), score_count=Sum('score_count')
+        )
+        mean = None
+        if totals['score_count']:
+            mean = totals['score_sum'] / totals['score_count']
+        # Wrapped, so that "no reviews yet" is cached too.
+        cached = (mean,)
+        cache.set(PRIOR_MEAN_KEY, cached, settings.RATING_PRIOR_TIMEOUT)
+    return cached[0]
+
+
+def get_weighted_rating(score_sum, score_count):
+    """Bayesian average: the title mean pulled towards the mean of all
+    reviews as if RATING_PRIOR_WEIGHT average reviews were added."""
+    prior_mean = get_prior_mean()
+    if prior_mean is None:
+        return None
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (weight * prior_mean + score_sum) / (weight + score_count)
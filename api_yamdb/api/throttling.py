@@ -0,0 +1,205 @@
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """'5/min' -> (capacity 5, refill of 5 tokens per 60 seconds)."""
+    if rate is None:
+        return None
+    number, period = rate.split('/')
+    capacity = int(number)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def refill(state, capacity, refill_rate, now):
+    """Token bucket step: returns the new state and seconds to wait."""
+    tokens, updated_at = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill_rate
+
+
+class MemoryBucketStore:
+    """Buckets in the memory of one process."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        with self.lock:
+            self.buckets[key], wait = refill(
+                self.buckets.get(key), capacity, refill_rate, time.time()
+            )
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """Buckets in a Django cache, shared when the cache backend is.
+
+    Read and write are not atomic, so concurrent requests may each get a
+    token from the same bucket; the error is bounded by the concurrency.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def consume(self, key, capacity, refill_rate):
+        cache = caches[self.alias]
+        key = f'throttle:{key}'
+        state, wait = refill(
+            cache.get(key), capacity, refill_rate, time.time()
+        )
+        cache.set(key, state, timeout=int(capacity / refill_rate) + 1)
+        return wait
+
+
+class SQLiteBucketStore:
+    """Buckets in an SQLite file shared by the gunicorn workers of a host.
+
+    Each step runs in a `BEGIN IMMEDIATE` transaction, so concurrent
+    workers take tokens from a bucket one at a time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def get_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL, updated_at REAL)'
+            )
+            self.local.connection = connection
+        return connection
+
+    def consume(self, key, capacity, refill_rate):
+        connection = self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            state = connection.execute(
+                'SELECT tokens, updated_at FROM bucket WHERE key = ?', (key,)
+            ).fetchone()
+            state, wait = refill(state, capacity, refill_rate, time.time())
+            connection.execute(
+                'INSERT OR REPLACE INTO bucket VALUES (?, ?, ?)',
+                (key, *state)
+            )
+        finally:
+            connection.execute('COMMIT')
+        return wait
+
+    def clear(self):
+        self.get_connection().execute('DELETE FROM bucket')
+
+
+STORES = {
+    'memory': MemoryBucketStore,
+    'cache': CacheBucketStore,
+    'sqlite': SQLiteBucketStore,
+}
+
+# Store configuration and the store built from it.
+_store = (None, None)
+
+
+def get_store():
+    """Bucket store from THROTTLE_STORE, rebuilt when the setting changes."""
+    global _store
+    config = (settings.THROTTLE_STORE, settings.THROTTLE_STORE_LOCATION)
+    if _store[0] != config:
+        name, location = config
+        _store = (
+            config, STORES[name](location) if location else STORES[name]()
+        )
+    return _store[1]
+
+
+def count(scope, event):
+    with _stats_lock:
+        _stats[scope, event] += 1
+
+
+def get_stats():
+    """Allowed and throttled request counters of this process by scope."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token bucket per client key; the rate comes from THROTTLE_RATES.
+
+    A rate of '5/min' gives a burst of 5 requests refilled at 5 per
+    minute. Requests without a key are not throttled.
+    """
+    scope = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_time = 0
+        rate = parse_rate(settings.THROTTLE_RATES.get(self.scope))
+        key = self.get_key(request, view)
+        if rate is None or key is None:
+            return True
+        self.wait_time = get_store().consume(f'{self.scope}:{key}', *rate)
+        count(self.scope, 'throttled' if self.wait_time else 'allowed')
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class FieldThrottle(TokenBucketThrottle):
+    field = None
+
+    def get_key(self, request, view):
+        value = request.data.get(self.field)
+        if not isinstance(value, str) or not value:
+            return None
+        return value.strip().lower()
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupEmailThrottle(FieldThrottle):
+    scope = 'signup_email'
+    field = 'email'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(FieldThrottle):
+    scope = 'token_username'
+    field = 'username'
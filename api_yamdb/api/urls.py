@@ -33,6 +33,18 @@ authpatterns = [
 ]
 
 urlpatterns = [
+    path(
+        'v1/leaderboard/<board>/',
+        views.LeaderboardView.as_view(),
+        name='leaderboard'
+    ),
+    path('v1/metrics/', views.MetricsView.as_view(), name='metrics'),
+    path('v1/search/', views.SearchView.as_view(), name='search'),
+    path(
+        'v1/export/<table>/',
+        views.ExportView.as_view(),
+        name='export'
+    ),
     path('v1/', include(v1_router.urls)),
     path('v1/', include(authpatterns)),
 ]
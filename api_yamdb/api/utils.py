@@ -1,7 +1,7 @@
 import random
 import string
 
-from django.core.mail import send_mail
+from core.mail import enqueue_email
 
 
 def gen_confirmation_code():
@@ -11,11 +11,10 @@ def gen_confirmation_code():
 
 
 def send_confirmation_code(email, confirmation_code):
-    send_mail(
+    enqueue_email(
         subject='Подтверждение регистрации на Yamdb',
         message='Спасибо за регистрацию!'
                 f'Ваш код подтверждения: {confirmation_code}',
         from_email='register@yambd.com',
-        recipient_list=[email],
-        fail_silently=False,
+        recipient=email,
     )
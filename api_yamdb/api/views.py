@@ -1,26 +1,47 @@
+from api.authentication import get_access_token
+from api.bulk import save_titles
+from api.export import EXPORT_TABLES, export
 from api.filters import TitleFilter
-from api.mixins import ListCreateDestroyViewSet
+from api.metrics import render_prometheus
+from api.mixins import (CachedListMixin, CachedRetrieveMixin,
+                        ConditionalListMixin, ConditionalRetrieveMixin,
+                        ListCreateDestroyViewSet, RowListMixin,
+                        SerializeMetricsMixin)
+from api.pagination import LimitOffsetOrCursorPagination
 from api.permissions import (IsAdminOrReadOnlyPermission, IsAdminPermission,
                              ReviewOrCommentPermission)
+from api.rows import RowPlan
+from api.search import get_search_backend
 from api.serializers import (CategorySerializer, CommentsSerializer,
-                             GenreSerializer, ReviewSerializer,
+                             ExportParamsSerializer, GenreSerializer,
+                             LeaderboardEntrySerializer,
+                             LeaderboardParamsSerializer,
+                             ReviewSearchSerializer, ReviewSerializer,
+                             SearchParamsSerializer, TitleReadSerializer,
+                             TitleSearchSerializer, TitleStatsSerializer,
                              TitleWriteSerializer, TokenSerializer,
                              UserSerializer)
+from api.throttling import (SignupEmailThrottle, SignupIPThrottle,
+                            TokenIPThrottle, TokenUsernameThrottle)
 from api.utils import gen_confirmation_code, send_confirmation_code
-from django.db.models import Avg
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import filters, generics, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import (Category, Comments, Genre, LeaderboardEntry,
+                            Review, Title, User, get_genre_prefetch)
 
 
 class RegisterView(APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = (SignupIPThrottle, SignupEmailThrottle)
 
     def post(self, request):
         email = request.data.get('email')
@@ -55,15 +76,21 @@ class RegisterView(APIView):
 
 class TokenView(APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenIPThrottle, TokenUsernameThrottle)
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        username = request.data.get('username')
-        confirmation_code = request.data.get('confirmation_code')
-        user = get_object_or_404(User, username=username)
-        refresh = RefreshToken.for_user(user)
-        if user.confirmation_code != confirmation_code:
+        user = get_object_or_404(
+            User.objects.only(
+                'id', 'username', 'role', 'is_staff', 'confirmation_code'
+            ),
+            username=serializer.validated_data['username']
+        )
+        if not constant_time_compare(
+            user.confirmation_code,
+            serializer.validated_data['confirmation_code']
+        ):
             return Response(
                 {
                     'confirmation_code': 'Неверный код подтверждения!',
@@ -72,13 +99,83 @@ class TokenView(APIView):
             )
         return Response(
             {
-                'token': str(refresh.access_token)
+                'token': str(get_access_token(user))
             },
             status=status.HTTP_200_OK
         )
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class ExportView(APIView):
+    permission_classes = (IsAdminPermission,)
+
+    def get(self, request, table):
+        if table not in EXPORT_TABLES:
+            raise Http404
+        params = ExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        content, content_type = export(table, **params.validated_data)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table}.{params.validated_data["output"]}"'
+        )
+        return response
+
+
+class LeaderboardView(SerializeMetricsMixin, generics.ListAPIView):
+    permission_classes = (AllowAny,)
+    serializer_class = LeaderboardEntrySerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        board = self.kwargs['board']
+        if board not in dict(LeaderboardEntry.BOARDS):
+            raise Http404
+        params = LeaderboardParamsSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        offset = params.validated_data['offset']
+        return LeaderboardEntry.objects.filter(
+            board=board,
+            category=params.validated_data['category'],
+            genre=params.validated_data['genre'],
+            rank__gt=offset,
+            rank__lte=offset + params.validated_data['limit'],
+        ).order_by('rank').select_related(
+            'title__category'
+        ).prefetch_related(get_genre_prefetch('title__genre'))
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminPermission,)
+
+    def get(self, request):
+        return HttpResponse(
+            render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+class SearchView(SerializeMetricsMixin, generics.ListAPIView):
+    permission_classes = (AllowAny,)
+    serializer_classes = {
+        'titles': TitleSearchSerializer,
+        'reviews': ReviewSearchSerializer,
+    }
+
+    @cached_property
+    def params(self):
+        params = SearchParamsSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data
+
+    def get_queryset(self):
+        backend = get_search_backend()
+        return getattr(backend, self.params['scope'])(self.params['q'])
+
+    def get_serializer_class(self):
+        return self.serializer_classes[self.params['scope']]
+
+
+class UsersViewSet(SerializeMetricsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdminPermission, permissions.IsAuthenticated)
@@ -109,7 +206,7 @@ class UsersViewSet(viewsets.ModelViewSet):
             detail=False, url_path='me',
             permission_classes=(permissions.IsAuthenticated,))
     def get_self_info(self, request):
-        user = request.user
+        user = get_object_or_404(User, pk=request.user.pk)
         serializer = self.get_serializer(user, many=False)
         if request.method == 'PATCH':
             data = request.data
@@ -122,68 +219,123 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                    SerializeMetricsMixin, RowListMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    row_plan = RowPlan(ReviewSerializer)
     permission_classes = (ReviewOrCommentPermission, )
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
 
-    def get_title(self):
+    @cached_property
+    def title(self):
         return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.title.reviews.select_related('author').defer(
+            'search_vector'
+        )
 
+    def get_conditional_queryset(self):
+        return Review.objects.filter(title_id=self.kwargs.get('title_id'))
+
+    # The title rating follows in api.signals, in the same transaction.
+    @transaction.atomic
     def perform_create(self, serializer):
-        if serializer.is_valid:
-            serializer.save(
-                title=self.get_title(),
-                author=self.request.user
-            )
+        serializer.save(title=self.title, author=self.request.user)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
 
-class CommentsViewSet(viewsets.ModelViewSet):
+
+class CommentsViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                      SerializeMetricsMixin, RowListMixin,
+                      viewsets.ModelViewSet):
     serializer_class = CommentsSerializer
+    row_plan = RowPlan(CommentsSerializer)
     permission_classes = (ReviewOrCommentPermission, )
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
 
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-
-    def get_review(self):
+    @cached_property
+    def review(self):
+        """Review of the route resolved together with its title."""
         return get_object_or_404(
-            Review,
+            Review.objects.select_related('title'),
             pk=self.kwargs.get('review_id'),
-            title=self.get_title())
+            title_id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.review.comments.select_related('author')
+
+    def get_conditional_queryset(self):
+        return Comments.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        )
 
     def perform_create(self, serializer):
         serializer.save(
-            review=self.get_review(),
+            review=self.review,
             author=self.request.user,
         )
 
 
-class CategoriesViewSet(ListCreateDestroyViewSet):
+class CategoriesViewSet(CachedListMixin, SerializeMetricsMixin,
+                        ListCreateDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnlyPermission,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_resource = 'categories'
 
 
-class GenresViewSet(ListCreateDestroyViewSet):
+class GenresViewSet(CachedListMixin, SerializeMetricsMixin,
+                    ListCreateDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnlyPermission,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_resource = 'genres'
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(Avg('reviews__score'))
+class TitlesViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                    CachedListMixin, CachedRetrieveMixin,
+                    SerializeMetricsMixin, RowListMixin,
+                    viewsets.ModelViewSet):
+    queryset = Title.objects.with_related()
     serializer_class = TitleWriteSerializer
+    row_plan = RowPlan(TitleReadSerializer)
     permission_classes = (IsAdminOrReadOnlyPermission,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('id',)
+    cache_resource = 'titles'
+
+    @action(detail=False, methods=('post', 'patch'), url_path='bulk')
+    def bulk(self, request):
+        titles, errors = save_titles(
+            request.data, partial=request.method == 'PATCH'
+        )
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            TitleReadSerializer(titles, many=True).data,
+            status=(status.HTTP_201_CREATED if request.method == 'POST'
+                    else status.HTTP_200_OK)
+        )
+
+    @action(detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        # The DRF variant: a non-numeric pk is a 404, not a ValueError.
+        title = generics.get_object_or_404(
+            Title.objects.with_stats(), pk=pk
+        )
+        return Response(TitleStatsSerializer(title).data)
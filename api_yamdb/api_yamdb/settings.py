@@ -1,6 +1,7 @@
 import os
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -28,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,17 +61,91 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# Threads per ASGI worker (api_yamdb.asgi, SERVER_MODE=asgi): each one
+# serves a request and holds its own database connection, so keep
+# DB_POOL_SIZE, when set, no smaller.
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', default=20))
+
+# Connections are kept for DB_CONN_MAX_AGE seconds and checked with
+# SELECT 1 before a new request reuses them (DB_HEALTH_CHECKS).
+# DB_POOL_SIZE > 0 gives each worker a bounded pool shared by its threads
+# instead, with the core.backends engine in place of the stock postgresql
+# or sqlite3 one; connections go back to it after every request.
+# DB_PGBOUNCER is for pgbouncer in transaction mode: no server-side
+# cursors, which live in a session.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', default=0))
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', default='false').lower() == 'true'
+DB_ENGINE = os.getenv('DB_ENGINE', default='django.db.backends.postgresql')
+if DB_POOL_SIZE:
+    DB_ENGINE = {
+        'django.db.backends.postgresql': 'core.backends.postgresql',
+        'django.db.backends.sqlite3': 'core.backends.sqlite3',
+    }.get(DB_ENGINE, DB_ENGINE)
+    if not DB_ENGINE.startswith('core.backends.'):
+        raise ImproperlyConfigured(
+            f'DB_POOL_SIZE не поддерживается движком {DB_ENGINE}'
+        )
+
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
+        'ENGINE': DB_ENGINE,
         'NAME': os.getenv('DB_NAME', default='postgres'),
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres1234'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'HEALTH_CHECKS': os.getenv('DB_HEALTH_CHECKS', default='true').lower() == 'true',
+        'POOL': {
+            'SIZE': DB_POOL_SIZE,
+            'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'MAX_AGE': int(os.getenv('DB_POOL_MAX_AGE', default=600)),
+        },
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
     }
 }
 
+# Read replicas: DB_REPLICA_HOSTS lists host[:port] of replicas with the
+# credentials of the primary. They serve reads of GET, HEAD and OPTIONS
+# requests outside transactions. After a write the client reads from the
+# primary for REPLICA_READ_YOUR_WRITES seconds, and so do response cache
+# misses of the changed resources.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')), 1
+):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'], HOST=host, PORT=port or DATABASES['default']['PORT']
+    )
+    DATABASE_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_READ_YOUR_WRITES = int(os.getenv('REPLICA_READ_YOUR_WRITES', default=5))
+
+# The 'auth' cache keeps role changes and revocations of users for the
+# lifetime of the tokens issued before them. Every worker must see them,
+# so AUTH_CACHE_BACKEND should be shared (memcached, redis, a database or
+# file cache). With a per-process one (locmem, dummy) access tokens are
+# checked against the users table on every request instead.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    },
+    'auth': {
+        'BACKEND': os.getenv('AUTH_CACHE_BACKEND', default=os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')),
+        'LOCATION': os.getenv('AUTH_CACHE_LOCATION', default=os.getenv('CACHE_LOCATION', default='yamdb-auth')),
+    },
+}
+
+AUTH_CACHE_ALIAS = 'auth'
+
+# Cached GET responses and the versions in their keys and ETags. They are
+# off unless the cache is shared by the workers (CACHE_BACKEND), since a
+# write would otherwise invalidate the cache of one worker only.
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -107,12 +184,62 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'api.authentication.TokenClaimsAuthentication'
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
+    # Client addresses for throttling come from the last X-Forwarded-For
+    # entry, which the nginx in front adds; earlier ones are the client's.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
+}
+
+# JSON of api.renderers and api.parsers: orjson, json (the stdlib) or
+# auto, which is orjson when it is installed.
+JSON_BACKEND = os.getenv('JSON_BACKEND', default='auto')
+
+# Weighted rating of /titles/{id}/stats/: a title mean is pulled towards
+# the mean of all reviews as if RATING_PRIOR_WEIGHT such reviews were
+# added; the overall mean is recalculated every RATING_PRIOR_TIMEOUT.
+RATING_PRIOR_WEIGHT = 10
+RATING_PRIOR_TIMEOUT = 300
+
+# Rankings of /api/v1/leaderboard/, rebuilt by `rebuild_leaderboard`.
+LEADERBOARD_SIZE = 100
+LEADERBOARD_TRENDING_DAYS = 7
+
+# Share of requests measured by api.middleware.MetricsMiddleware; the
+# histograms are served to admins at /api/v1/metrics/. They are kept by
+# each worker, so with several workers set METRICS_DIR: a directory where
+# every worker writes its state at most each METRICS_FLUSH_INTERVAL
+# seconds and the endpoint sums them. gunicorn empties it on start.
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', default=1))
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', default=1))
+
+# Token buckets for the anonymous auth endpoints: 'N/period' is a burst
+# of N requests refilled at N per period. THROTTLE_STORE is memory, cache
+# or sqlite (THROTTLE_STORE_LOCATION is then the file shared by workers).
+# THROTTLE_DISABLED=true turns them off, for load tests only.
+THROTTLE_RATES = {
+    'signup_ip': '20/hour',
+    'signup_email': '5/hour',
+    'token_ip': '60/min',
+    'token_username': '10/min',
 }
+if os.getenv('THROTTLE_DISABLED', default='false').lower() == 'true':
+    THROTTLE_RATES = {}
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', default='cache')
+THROTTLE_STORE_LOCATION = os.getenv('THROTTLE_STORE_LOCATION')
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -123,3 +250,13 @@ AUTH_USER_MODEL = 'reviews.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# thread: drain the outbox in a background thread of the web worker,
+# which also sets a timer for the next retry of failed emails;
+# worker: leave it to `python manage.py send_emails --loop`.
+# Emails are claimed for EMAIL_OUTBOX_CLAIM_TIMEOUT seconds while sent.
+EMAIL_OUTBOX_MODE = os.getenv('EMAIL_OUTBOX_MODE', default='thread')
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
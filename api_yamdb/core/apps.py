@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core.db import check_connections, count_new_connection
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        request_started.connect(check_connections)
+        connection_created.connect(count_new_connection)
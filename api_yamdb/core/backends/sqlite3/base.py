@@ -0,0 +1,6 @@
+from core.db import PooledDatabaseWrapperMixin
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
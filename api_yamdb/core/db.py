@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from django.db import OperationalError, connections
+from django.utils.functional import cached_property
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def count(alias, event):
+    with _stats_lock:
+        _stats[alias, event] += 1
+
+
+def get_stats():
+    """Connection events of this process by database alias: opened,
+    reused, expired, health_check_failed, discarded and timeout."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def is_healthy(connection):
+    """Whether a driver connection still answers a query."""
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SELECT 1')
+        cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+class ConnectionPool:
+    """Bounded pool of driver connections shared by the threads of a
+    worker process.
+
+    No more than `size` connections are open at once, taken and idle
+    together; a thread waits up to `timeout` seconds for a free one.
+    Idle connections older than `max_age` seconds are closed instead of
+    reused, and with `health_checks` the rest have to answer SELECT 1.
+    """
+
+    def __init__(self, alias, size, timeout=5, max_age=None,
+                 health_checks=True):
+        self.alias = alias
+        self.size = size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.health_checks = health_checks
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = deque()
+        self.opened_at = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, connect):
+        """Idle connection, or a new one from `connect()`."""
+        if not self.slots.acquire(timeout=self.timeout):
+            count(self.alias, 'timeout')
+            raise OperationalError(
+                f'Нет свободного соединения с базой {self.alias} '
+                f'за {self.timeout} с'
+            )
+        try:
+            connection = self.take_idle()
+            if connection is None:
+                connection = connect()
+                self.opened_at[connection] = time.monotonic()
+                count(self.alias, 'opened')
+        except BaseException:
+            self.slots.release()
+            raise
+        return connection
+
+    def take_idle(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection = self.idle.pop()
+            if self.is_expired(connection):
+                self.discard(connection, 'expired')
+            elif self.health_checks and not is_healthy(connection):
+                self.discard(connection, 'health_check_failed')
+            else:
+                count(self.alias, 'reused')
+                return connection
+
+    def release(self, connection, reusable=True):
+        try:
+            if not reusable:
+                self.discard(connection, 'discarded')
+            elif self.is_expired(connection):
+                self.discard(connection, 'expired')
+            else:
+                with self.lock:
+                    self.idle.append(connection)
+        finally:
+            self.slots.release()
+
+    def is_expired(self, connection):
+        return self.max_age is not None and (
+            time.monotonic() - self.opened_at[connection] >= self.max_age
+        )
+
+    def discard(self, connection, event):
+        self.opened_at.pop(connection, None)
+        count(self.alias, event)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def clear(self):
+        """Close idle connections, for example before a fork."""
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+        for connection in idle:
+            self.opened_at.pop(connection, None)
+            connection.close()
+
+
+def get_pool(alias, options, health_checks):
+    # Keyed by process too: a pool must not cross a gunicorn fork.
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                alias,
+                size=options['SIZE'],
+                timeout=options.get('TIMEOUT', 5),
+                max_age=options.get('MAX_AGE'),
+                health_checks=health_checks,
+            )
+        return _pools[key]
+
+
+class PooledDatabaseWrapperMixin:
+    """Database backend mixin that takes driver connections from a
+    `ConnectionPool` set up by the POOL database setting and gives them
+    back on close.
+
+    Use it with CONN_MAX_AGE 0: connections then go back to the pool at
+    the end of every request and POOL['MAX_AGE'] limits their life.
+    """
+
+    @cached_property
+    def pool(self):
+        options = self.settings_dict.get('POOL') or {}
+        if not options.get('SIZE'):
+            return None
+        return get_pool(
+            self.alias, options, self.settings_dict.get('HEALTH_CHECKS')
+        )
+
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+        connect = super().get_new_connection
+        return self.pool.acquire(lambda: connect(conn_params))
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            super()._close()
+            return
+        connection, reusable = self.connection, not self.errors_occurred
+        if reusable:
+            try:
+                connection.rollback()
+            except Exception:
+                reusable = False
+        self.pool.release(connection, reusable)
+
+
+def check_connections(**kwargs):
+    """Count connections kept from earlier requests and, with the
+    HEALTH_CHECKS database setting, close the ones that do not answer
+    before the request gets to use them."""
+    for connection in connections.all():
+        if connection.connection is None or getattr(
+            connection, 'pool', None
+        ):
+            continue
+        if (connection.settings_dict.get('HEALTH_CHECKS')
+                and not connection.is_usable()):
+            count(connection.alias, 'health_check_failed')
+            connection.close()
+        else:
+            count(connection.alias, 'reused')
+
+
+def count_new_connection(sender, connection, **kwargs):
+    # Pools count their own connections: they connect on every checkout.
+    if getattr(connection, 'pool', None) is None:
+        count(connection.alias, 'opened')
@@ -0,0 +1,144 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='outbox')
+_lock = threading.Lock()
+_queued = None
+_timer = None
+
+
+def enqueue_email(subject, message, from_email, recipient):
+    """Store an email in the outbox; delivery happens off the request."""
+    OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipient=recipient,
+    )
+    if settings.EMAIL_OUTBOX_MODE == 'thread':
+        transaction.on_commit(schedule_drain)
+
+
+def schedule_drain():
+    """Queue one drain in the background thread unless one is waiting."""
+    global _queued
+    with _lock:
+        if _queued is not None and not (
+            _queued.running() or _queued.done()
+        ):
+            return
+        _queued = _executor.submit(drain_in_thread)
+
+
+def drain_in_thread():
+    try:
+        while drain_outbox():
+            pass
+        schedule_retry()
+    except Exception:
+        logger.exception('Ошибка отправки писем из очереди')
+    finally:
+        connection.close()
+
+
+def schedule_retry():
+    """Drain again when the first failed email is due: in thread mode
+    nothing else would retry it until the next email is queued."""
+    global _timer
+    next_attempt_at = OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    ).order_by('next_attempt_at').values_list(
+        'next_attempt_at', flat=True
+    ).first()
+    if next_attempt_at is None:
+        return
+    delay = max((next_attempt_at - timezone.now()).total_seconds(), 0)
+    with _lock:
+        if _timer is not None:
+            _timer.cancel()
+        _timer = threading.Timer(delay, schedule_drain)
+        _timer.daemon = True
+        _timer.start()
+
+
+def get_backoff(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_emails(batch_size):
+    """Take a batch of due emails in a short transaction.
+
+    Their next attempt moves EMAIL_OUTBOX_CLAIM_TIMEOUT ahead, so other
+    drains skip them while they are sent and a drain that dies midway
+    only delays them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                next_attempt_at__lte=now,
+                attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        claimed_until = now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = claimed_until
+        OutgoingEmail.objects.bulk_update(
+            emails, ('attempts', 'next_attempt_at')
+        )
+    return emails
+
+
+def drain_outbox(batch_size=None):
+    """Send one batch of due emails over a single SMTP connection.
+
+    The batch is claimed first and sent outside any transaction. Failed
+    emails are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS is reached. Returns the number of emails
+    taken from the outbox.
+    """
+    emails = claim_emails(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception:
+        logger.exception('Не удалось открыть соединение с почтой')
+    for email in emails:
+        try:
+            EmailMessage(
+                email.subject, email.message, email.from_email,
+                [email.recipient], connection=mail_connection
+            ).send()
+        except Exception as error:
+            email.next_attempt_at = timezone.now() + get_backoff(
+                email.attempts
+            )
+            email.last_error = str(error)
+        else:
+            email.sent_at = timezone.now()
+            email.last_error = ''
+    mail_connection.close()
+    OutgoingEmail.objects.bulk_update(
+        emails, ('next_attempt_at', 'sent_at', 'last_error')
+    )
+    return len(emails)
@@ -0,0 +1,26 @@
+import time
+
+from core.mail import drain_outbox
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пакетами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя очередь с интервалом'
+        )
+        parser.add_argument('--interval', type=float, default=1.0)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = drain_outbox(options['batch_size'])
+            while sent:
+                self.stdout.write(f'Обработано писем: {sent}')
+                sent = drain_outbox(options['batch_size'])
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -11,3 +11,59 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class UpdatedModel(models.Model):
+    """Abstract model. Adding date of the last change."""
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+
+    class Meta:
+        abstract = True
+
+
+class OutgoingEmail(CreatedModel):
+    """Email waiting in the outbox for the delivery worker."""
+    subject = models.CharField(
+        'Тема',
+        max_length=255
+    )
+    message = models.TextField(
+        'Текст'
+    )
+    from_email = models.EmailField(
+        'Отправитель'
+    )
+    recipient = models.EmailField(
+        'Получатель'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попытки отправки',
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    sent_at = models.DateTimeField(
+        'Дата отправки',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outgoingemail_due_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
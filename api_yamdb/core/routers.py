@@ -0,0 +1,45 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = threading.local()
+
+
+def get_replica():
+    """Random replica alias of DATABASE_REPLICAS, or None without them."""
+    if not settings.DATABASE_REPLICAS:
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def read_from(alias):
+    """Send ORM reads of this thread to a replica alias; None keeps them
+    on the primary."""
+    previous = getattr(_state, 'alias', None)
+    _state.alias = alias
+    try:
+        yield
+    finally:
+        _state.alias = previous
+
+
+class ReplicaRouter:
+    """Reads go to the replica set by `read_from()` (for safe requests,
+    `api.middleware.ReplicaMiddleware`), except inside transactions;
+    writes and everything else go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        alias = getattr(_state, 'alias', None)
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -0,0 +1,150 @@
+import random
+import uuid
+
+from core.utils import bulk_create
+from django.contrib.auth.hashers import make_password
+from reviews.models import (Category, Comments, Genre, GenreTitle, Review,
+                            Title, User)
+
+
+def get_new_ids(model, after_id):
+    return list(
+        model.objects.filter(pk__gt=after_id).values_list('pk', flat=True)
+    )
+
+
+def get_last_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return last or 0
+
+
+def get_prefix():
+    return f'synthetic-{uuid.uuid4().hex[:8]}'
+
+
+def generate_catalog(titles, categories=20, genres=50, genres_per_title=2,
+                     batch_size=5000, seed=0, prefix=None):
+    """Insert a synthetic catalog and return ids of the new titles."""
+    rand = random.Random(seed)
+    prefix = prefix or get_prefix()
+    last_category = get_last_id(Category)
+    bulk_create(
+        Category,
+        (Category(name=f'Категория {i}', slug=f'{prefix}-category-{i}')
+         for i in range(categories)),
+        batch_size
+    )
+    category_ids = get_new_ids(Category, last_category)
+    last_genre = get_last_id(Genre)
+    bulk_create(
+        Genre,
+        (Genre(name=f'Жанр {i}', slug=f'{prefix}-genre-{i}')
+         for i in range(genres)),
+        batch_size
+    )
+    genre_ids = get_new_ids(Genre, last_genre)
+    last_title = get_last_id(Title)
+    bulk_create(
+        Title,
+        (Title(
+            name=f'Произведение {i} {rand.choice(("альфа", "бета", "гамма"))}',
+            year=rand.randint(1900, 2020),
+            category_id=rand.choice(category_ids),
+            description=f'Описание произведения {i}'
+        ) for i in range(titles)),
+        batch_size
+    )
+    title_ids = get_new_ids(Title, last_title)
+    bulk_create(
+        GenreTitle,
+        (GenreTitle(title_id=title_id, genre_id=genre_id)
+         for title_id in title_ids
+         for genre_id in rand.sample(genre_ids, genres_per_title)),
+        batch_size
+    )
+    return title_ids
+
+
+def generate_users(users, batch_size=5000, prefix=None):
+    """Insert users with unusable passwords and return their ids."""
+    prefix = prefix or get_prefix()
+    password = make_password(None)
+    last_user = get_last_id(User)
+    bulk_create(
+        User,
+        (User(
+            username=f'{prefix}-user-{i}',
+            email=f'{prefix}-user-{i}@yamdb.fake',
+            role='user',
+            password=password,
+        ) for i in range(users)),
+        batch_size
+    )
+    return get_new_ids(User, last_user)
+
+
+def generate_reviews(title_ids, user_ids, per_title=5, batch_size=5000,
+                     seed=0):
+    """Insert up to `per_title` reviews by distinct authors on each title
+    and return ids of the new reviews; ratings are rebuilt afterwards."""
+    rand = random.Random(seed)
+    per_title = min(per_title, len(user_ids))
+    authors = (
+        (title_id, author_id) for title_id in title_ids
+        for author_id in rand.sample(user_ids, per_title)
+    )
+    last_review = get_last_id(Review)
+    bulk_create(
+        Review,
+        (Review(
+            title_id=title_id,
+            author_id=author_id,
+            text=f'Отзыв {rand.choice(("хороший", "плохой", "средний"))} '
+                 f'на произведение {title_id}',
+            score=rand.randint(1, 10),
+        ) for title_id, author_id in authors),
+        batch_size
+    )
+    Title.rebuild_ratings()
+    return get_new_ids(Review, last_review)
+
+
+def generate_comments(review_ids, user_ids, per_review=2, batch_size=5000,
+                      seed=0):
+    """Insert `per_review` comments on each review and return their ids."""
+    rand = random.Random(seed)
+    last_comment = get_last_id(Comments)
+    bulk_create(
+        Comments,
+        (Comments(
+            review_id=review_id,
+            author_id=rand.choice(user_ids),
+            text=f'Комментарий {i} к отзыву {review_id}',
+        ) for review_id in review_ids for i in range(per_review)),
+        batch_size
+    )
+    return get_new_ids(Comments, last_comment)
+
+
+def generate_dataset(users=100, titles=1000, categories=20, genres=50,
+                     genres_per_title=2, reviews_per_title=5,
+                     comments_per_review=2, batch_size=5000, seed=0):
+    """Insert users, a catalog, reviews and comments; return their ids."""
+    prefix = get_prefix()
+    user_ids = generate_users(users, batch_size, prefix)
+    title_ids = generate_catalog(
+        titles, categories, genres, genres_per_title, batch_size, seed,
+        prefix
+    )
+    review_ids = generate_reviews(
+        title_ids, user_ids, reviews_per_title, batch_size, seed
+    )
+    comment_ids = generate_comments(
+        review_ids, user_ids, comments_per_review, batch_size, seed
+    )
+    return {
+        'users': user_ids,
+        'titles': title_ids,
+        'reviews': review_ids,
+        'comments': comment_ids,
+    }
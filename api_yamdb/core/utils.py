@@ -0,0 +1,30 @@
+import math
+from itertools import islice
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def bulk_create(model, objs, batch_size):
+    """Insert objects in chunks of `batch_size` without building them all.
+
+    Django still splits each chunk further if the backend limits the
+    number of query parameters (SQLite).
+    """
+    created = 0
+    for batch in batches(objs, batch_size):
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
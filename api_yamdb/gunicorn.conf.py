@@ -0,0 +1,16 @@
+import glob
+import os
+
+# SERVER_MODE=wsgi: sync workers, one request at a time each;
+# SERVER_MODE=asgi: uvicorn workers, ASGI_THREADS requests at a time each.
+if os.getenv('SERVER_MODE', 'wsgi') == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+
+
+def on_starting(server):
+    """Start the counters of METRICS_DIR from zero with a new master; the
+    files of workers it replaces later stay in the sums."""
+    directory = os.getenv('METRICS_DIR')
+    if directory:
+        for filename in glob.glob(os.path.join(directory, '*.json')):
+            os.remove(filename)
@@ -0,0 +1,100 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from core.utils import bulk_create
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import GenreTitle, LeaderboardEntry, Review, Title
+
+
+def get_top(scores, size):
+    return heapq.nlargest(size, scores, key=lambda item: (item[1], -item[0]))
+
+
+def build_entries(board, ranking, category='', genre=''):
+    return (
+        LeaderboardEntry(
+            board=board, category=category, genre=genre, rank=rank,
+            title_id=title_id, score=score
+        )
+        for rank, (title_id, score) in enumerate(ranking, 1)
+    )
+
+
+def get_weighted_ratings():
+    """Bayesian average of every reviewed title from stored aggregates."""
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), score_count=Sum('score_count')
+    )
+    if not totals['score_count']:
+        return {}
+    weight = settings.RATING_PRIOR_WEIGHT
+    prior = weight * totals['score_sum'] / totals['score_count']
+    return {
+        title_id: (prior + score_sum) / (weight + score_count)
+        for title_id, score_sum, score_count in Title.objects.filter(
+            score_count__gt=0
+        ).values_list('id', 'score_sum', 'score_count').iterator()
+    }
+
+
+def get_top_entries(size):
+    ratings = get_weighted_ratings()
+    yield from build_entries(
+        LeaderboardEntry.TOP, get_top(ratings.items(), size)
+    )
+    by_category = defaultdict(list)
+    for title_id, slug in Title.objects.filter(
+        score_count__gt=0, category__isnull=False
+    ).values_list('id', 'category__slug').iterator():
+        if title_id in ratings:
+            by_category[slug].append((title_id, ratings[title_id]))
+    for slug, scores in by_category.items():
+        yield from build_entries(
+            LeaderboardEntry.TOP, get_top(scores, size), category=slug
+        )
+    by_genre = defaultdict(list)
+    for title_id, slug in GenreTitle.objects.filter(
+        title__score_count__gt=0
+    ).values_list('title_id', 'genre__slug').iterator():
+        if title_id in ratings:
+            by_genre[slug].append((title_id, ratings[title_id]))
+    for slug, scores in by_genre.items():
+        yield from build_entries(
+            LeaderboardEntry.TOP, get_top(scores, size), genre=slug
+        )
+
+
+def get_trending_entries(size, days):
+    since = timezone.now() - timedelta(days=days)
+    counts = Review.objects.filter(pub_date__gte=since).order_by().values(
+        'title'
+    ).annotate(count=Count('pk')).values_list('title', 'count')
+    return build_entries(
+        LeaderboardEntry.TRENDING, get_top(counts.iterator(), size)
+    )
+
+
+def rebuild_leaderboard(size=None, trending_days=None, batch_size=5000):
+    """Replace all rankings in one transaction and return the row count.
+
+    Top boards (overall, per category and per genre) rank titles by the
+    weighted rating; the trending board ranks them by the number of
+    reviews over the last `trending_days`.
+    """
+    size = size or settings.LEADERBOARD_SIZE
+    trending_days = trending_days or settings.LEADERBOARD_TRENDING_DAYS
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        created = bulk_create(
+            LeaderboardEntry, get_top_entries(size), batch_size
+        )
+        created += bulk_create(
+            LeaderboardEntry, get_trending_entries(size, trending_days),
+            batch_size
+        )
+    return created
@@ -0,0 +1,391 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+from api.authentication import get_access_token
+from core.synthetic import generate_dataset
+from core.utils import percentile
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.leaderboard import rebuild_leaderboard
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+# Bulk writes send this many titles.
+BULK_SIZE = 10
+TITLE = {
+    'name': 'Произведение {slug}', 'year': 2000,
+    'category': '{category}', 'genre': ['{genre}'],
+}
+
+# Name, method, path, client role and request body: every route of
+# api/urls.py. Paths are filled from a random comment of the dataset and
+# its review and title, {slug} is new for each request. The author role
+# is a new user, who has no reviews yet; the objects of {new_...}
+# placeholders are created for the request, to be deleted.
+ENDPOINTS = (
+    ('categories-list', 'get', '/api/v1/categories/', None, None),
+    ('categories-create', 'post', '/api/v1/categories/', 'admin',
+     {'name': 'Категория {slug}', 'slug': '{slug}'}),
+    ('categories-delete', 'delete', '/api/v1/categories/{new_category}/',
+     'admin', None),
+    ('genres-list', 'get', '/api/v1/genres/', None, None),
+    ('genres-create', 'post', '/api/v1/genres/', 'admin',
+     {'name': 'Жанр {slug}', 'slug': '{slug}'}),
+    ('genres-delete', 'delete', '/api/v1/genres/{new_genre}/', 'admin',
+     None),
+    ('titles-list', 'get', '/api/v1/titles/', None, None),
+    ('titles-filter', 'get', '/api/v1/titles/?genre={genre}', None, None),
+    ('titles-detail', 'get', '/api/v1/titles/{title}/', None, None),
+    ('titles-stats', 'get', '/api/v1/titles/{title}/stats/', None, None),
+    ('titles-create', 'post', '/api/v1/titles/', 'admin', TITLE),
+    ('titles-update', 'patch', '/api/v1/titles/{title}/', 'admin',
+     {'description': 'Описание {slug}'}),
+    ('titles-delete', 'delete', '/api/v1/titles/{new_title}/', 'admin',
+     None),
+    ('titles-bulk-create', 'post', '/api/v1/titles/bulk/', 'admin',
+     [TITLE] * BULK_SIZE),
+    ('titles-bulk-update', 'patch', '/api/v1/titles/bulk/', 'admin',
+     [{'id': '{title}', 'description': 'Описание {slug}'}]),
+    ('reviews-list', 'get', '/api/v1/titles/{title}/reviews/', None, None),
+    ('reviews-detail', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/', None, None),
+    ('reviews-create', 'post', '/api/v1/titles/{title}/reviews/', 'author',
+     {'text': 'Отзыв замера', 'score': 7}),
+    ('reviews-update', 'patch',
+     '/api/v1/titles/{title}/reviews/{review}/', 'admin',
+     {'text': 'Отзыв замера'}),
+    ('reviews-delete', 'delete',
+     '/api/v1/titles/{title}/reviews/{new_review}/', 'admin', None),
+    ('comments-list', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/comments/', None, None),
+    ('comments-detail', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+     None, None),
+    ('comments-create', 'post',
+     '/api/v1/titles/{title}/reviews/{review}/comments/', 'user',
+     {'text': 'Комментарий замера'}),
+    ('comments-update', 'patch',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+     'admin', {'text': 'Комментарий замера'}),
+    ('comments-delete', 'delete',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{new_comment}/',
+     'admin', None),
+    ('leaderboard-top', 'get', '/api/v1/leaderboard/top/', None, None),
+    ('leaderboard-trending', 'get', '/api/v1/leaderboard/trending/', None,
+     None),
+    ('search', 'get', '/api/v1/search/?q=отзыв&scope=reviews', None, None),
+    ('users-list', 'get', '/api/v1/users/', 'admin', None),
+    ('users-create', 'post', '/api/v1/users/', 'admin',
+     {'username': '{slug}', 'email': '{slug}@yamdb.fake'}),
+    ('users-detail', 'get', '/api/v1/users/{username}/', 'admin', None),
+    ('users-update', 'patch', '/api/v1/users/{username}/', 'admin',
+     {'bio': 'Профиль замера'}),
+    ('users-delete', 'delete', '/api/v1/users/{new_user}/', 'admin', None),
+    ('users-me', 'get', '/api/v1/users/me/', 'user', None),
+    ('users-me-update', 'patch', '/api/v1/users/me/', 'user',
+     {'bio': 'Профиль замера'}),
+    ('export-titles', 'get', '/api/v1/export/titles/', 'admin', None),
+    ('export-reviews', 'get', '/api/v1/export/reviews/', 'admin', None),
+    ('export-comments', 'get', '/api/v1/export/comments/', 'admin', None),
+    ('metrics', 'get', '/api/v1/metrics/', 'admin', None),
+    ('auth-signup', 'post', '/api/v1/auth/signup/', None,
+     {'username': '{username}', 'email': '{email}'}),
+    ('auth-token', 'post', '/api/v1/auth/token/', None,
+     {'username': '{username}', 'confirmation_code': '{confirmation_code}'}),
+)
+
+
+def fill(value, params):
+    """Request body template `value` with `params` put into its strings."""
+    if isinstance(value, dict):
+        return {key: fill(item, params) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, params) for item in value]
+    if isinstance(value, str):
+        return value.format(**params)
+    return value
+
+
+def get_percentile_ms(timings, percent):
+    return round(percentile(timings, percent) * 1000, 3) if timings else None
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетические данные и нагружает все эндпоинты API: '
+            'p50/p95/p99, запросов в секунду и SQL-запросов на запрос; '
+            'результат пишется в JSON. Без --base-url запросы идут через '
+            'тестовый клиент, а данные удаляются после замера')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--reviews-per-title', type=int, default=5)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Количество замеряемых запросов на эндпоинт'
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--endpoint', action='append', dest='endpoints',
+            choices=[endpoint[0] for endpoint in ENDPOINTS],
+            help='Замерить только указанные эндпоинты'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Адрес запущенного сервера (например, gunicorn); данные '
+                 'при этом сохраняются в базе, а SQL не считается'
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+        parser.add_argument(
+            '--compare', help='JSON прошлого запуска для сравнения p95'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rand = random.Random(options['seed'])
+        if options['base_url']:
+            self.run(options)
+            return
+        with transaction.atomic(), override_settings(THROTTLE_RATES={}):
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        start = time.perf_counter()
+        dataset = generate_dataset(
+            users=options['users'],
+            titles=options['titles'],
+            categories=options['categories'],
+            genres=options['genres'],
+            reviews_per_title=options['reviews_per_title'],
+            comments_per_review=options['comments_per_review'],
+            seed=options['seed'],
+        )
+        self.stdout.write(
+            'Сгенерировано: ' + ', '.join(
+                f'{table} {len(ids)}' for table, ids in dataset.items()
+            ) + f' за {time.perf_counter() - start:.1f} с'
+        )
+        rebuild_leaderboard()
+        self.prepare(dataset)
+        endpoints = [
+            endpoint for endpoint in ENDPOINTS
+            if not options['endpoints'] or endpoint[0] in options['endpoints']
+        ]
+        results = {}
+        for endpoint in endpoints:
+            results[endpoint[0]] = self.measure(endpoint, options)
+            self.report(endpoint[0], results[endpoint[0]])
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'mode': 'http' if options['base_url'] else 'client',
+            'options': {
+                name: options[name] for name in (
+                    'users', 'titles', 'categories', 'genres',
+                    'reviews_per_title', 'comments_per_review',
+                    'requests', 'warmup', 'seed',
+                )
+            },
+            'endpoints': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def prepare(self, dataset):
+        comment_ids = self.rand.sample(
+            dataset['comments'], min(len(dataset['comments']), 1000)
+        )
+        self.paths = list(
+            Comments.objects.filter(id__in=comment_ids).values_list(
+                'review__title_id', 'review_id', 'id'
+            )
+        )
+        self.genres = list(Genre.objects.filter(
+            id__in=Genre.objects.order_by('-id')[:10].values('id')
+        ).values_list('slug', flat=True))
+        self.categories = list(Category.objects.filter(
+            id__in=Category.objects.order_by('-id')[:10].values('id')
+        ).values_list('slug', flat=True))
+        users = User.objects.filter(id__in=dataset['users'][:100])
+        self.users = list(
+            users.values_list('username', 'email', 'confirmation_code')
+        )
+        self.user = users.first()
+        self.tokens = {
+            'admin': str(get_access_token(self.create_user('admin'))),
+            'user': str(get_access_token(self.user)),
+        }
+
+    def create_user(self, role='user'):
+        # Not from self.rand: runs against a server keep their users.
+        name = f'bench-{role}-{uuid.uuid4().hex[:12]}'
+        return User.objects.create_user(
+            username=name, email=f'{name}@yamdb.fake', role=role
+        )
+
+    def get_params(self, path, role):
+        """Path and body parameters, with the objects and the author
+        token the request needs created outside the measurement."""
+        title, review, comment = self.rand.choice(self.paths)
+        username, email, confirmation_code = self.rand.choice(self.users)
+        params = {
+            'title': title,
+            'review': review,
+            'comment': comment,
+            'genre': self.rand.choice(self.genres),
+            'category': self.rand.choice(self.categories),
+            'username': username,
+            'email': email,
+            'confirmation_code': confirmation_code,
+            'slug': f'bench-{uuid.uuid4().hex[:12]}',
+        }
+        if role == 'author':
+            self.tokens['author'] = str(get_access_token(self.create_user()))
+        for name, create in self.get_creators(params).items():
+            if f'{{{name}}}' in path:
+                params[name] = create()
+        return params
+
+    def get_creators(self, params):
+        """Functions that create the objects of {new_...} placeholders
+        and return their keys."""
+        slug = params['slug']
+        return {
+            'new_category': lambda: Category.objects.create(
+                name=slug, slug=slug
+            ).slug,
+            'new_genre': lambda: Genre.objects.create(
+                name=slug, slug=slug
+            ).slug,
+            'new_title': lambda: Title.objects.create(
+                name=slug, year=2000
+            ).id,
+            'new_review': lambda: Review.objects.create(
+                title_id=params['title'], author=self.create_user(),
+                text='Отзыв замера', score=7
+            ).id,
+            'new_comment': lambda: Comments.objects.create(
+                review_id=params['review'], author=self.user,
+                text='Комментарий замера'
+            ).id,
+            'new_user': lambda: self.create_user().username,
+        }
+
+    def measure(self, endpoint, options):
+        name, method, path, role, body = endpoint
+        send = self.send_http if options['base_url'] else self.send_client
+        timings, queries, statuses = [], [], []
+        for number in range(options['warmup'] + options['requests']):
+            params = self.get_params(path, role)
+            elapsed, status, query_count = send(
+                method, path.format(**params), role, fill(body, params),
+                options
+            )
+            if number < options['warmup']:
+                continue
+            statuses.append(status)
+            # Rejected requests (throttled ones among them) are not
+            # served and would only pull the percentiles down.
+            if status >= 400:
+                continue
+            timings.append(elapsed)
+            if query_count is not None:
+                queries.append(query_count)
+        total = sum(timings)
+        return {
+            'requests': len(statuses),
+            'rejected': sum(400 <= status < 500 for status in statuses),
+            'errors': sum(status >= 500 for status in statuses),
+            'rps': round(len(timings) / total, 1) if total else None,
+            'mean_ms': (
+                round(total / len(timings) * 1000, 3) if timings else None
+            ),
+            'p50_ms': get_percentile_ms(timings, 50),
+            'p95_ms': get_percentile_ms(timings, 95),
+            'p99_ms': get_percentile_ms(timings, 99),
+            'queries_per_request': (
+                round(sum(queries) / len(queries), 2) if queries else None
+            ),
+        }
+
+    def send_client(self, method, path, role, data, options):
+        client = APIClient()
+        # Bodies go as JSON, like in send_http.
+        client.default_format = 'json'
+        if role:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {self.tokens[role]}'
+            )
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = getattr(client, method)(path, data)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - start
+        return elapsed, response.status_code, len(context.captured_queries)
+
+    def send_http(self, method, path, role, data, options):
+        headers = {'Content-Type': 'application/json'}
+        if role:
+            headers['Authorization'] = f'Bearer {self.tokens[role]}'
+        request = urllib.request.Request(
+            options['base_url'].rstrip('/') + urllib.parse.quote(
+                path, safe='/?=&'
+            ),
+            data=json.dumps(data).encode() if data else None,
+            headers=headers,
+            method=method.upper()
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            status = error.code
+        return time.perf_counter() - start, status, None
+
+    def report(self, name, result):
+        queries = result['queries_per_request']
+        line = f'{name:<20} ' + (
+            f'{result["rps"]:8.1f} запр./с  '
+            f'p50 {result["p50_ms"]:8.2f}  p95 {result["p95_ms"]:8.2f}  '
+            f'p99 {result["p99_ms"]:8.2f} мс'
+            if result['rps'] is not None else 'нет успешных ответов'
+        )
+        if queries is not None:
+            line += f'  {queries:.1f} SQL'
+        if result['rejected']:
+            line += f'  отклонено {result["rejected"]}'
+        if result['errors']:
+            line += f'  ошибок {result["errors"]}'
+        self.stdout.write(line)
+
+    def compare(self, filename, results):
+        with open(filename, encoding='utf-8') as file:
+            previous = json.load(file)['endpoints']
+        for name, result in results.items():
+            before = previous.get(name, {}).get('p95_ms')
+            after = result['p95_ms']
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(
+                f'{name:<20} p95 {before:8.2f} -> {after:8.2f} мс '
+                f'({change:+.0f}%)'
+            )
@@ -0,0 +1,156 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from core.synthetic import generate_dataset
+from core.utils import percentile
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Title
+
+READ_PATHS = (
+    '/api/v1/categories/',
+    '/api/v1/titles/',
+    '/api/v1/titles/{title}/',
+    '/api/v1/titles/{title}/reviews/',
+)
+SIGNUP_PATH = '/api/v1/auth/signup/'
+# gunicorn 20.0 cannot be run with -m.
+GUNICORN = 'from gunicorn.app.wsgiapp import run; run()'
+
+
+class Command(BaseCommand):
+    help = ('Запускает gunicorn с синхронными воркерами (wsgi) и с воркерами '
+            'uvicorn (asgi) и нагружает каждый смесью чтений и регистраций: '
+            'запросов в секунду и p50/p95 по видам запросов. Нужна база в '
+            'файле или на сервере; данные сохраняются в ней')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument(
+            '--concurrency', type=int, default=32,
+            help='Количество одновременных клиентов'
+        )
+        parser.add_argument(
+            '--signup-share', type=float, default=0.2,
+            help='Доля регистраций среди запросов'
+        )
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--port', type=int, default=8100)
+        parser.add_argument(
+            '--mode', action='append', dest='modes',
+            choices=('wsgi', 'asgi'), help='Замерить только этот режим'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if settings.DATABASES['default']['NAME'] == ':memory:':
+            raise CommandError('Серверам нужна общая база, а не :memory:')
+        dataset = generate_dataset(
+            users=10,
+            titles=options['titles'],
+            reviews_per_title=1,
+            comments_per_review=0,
+            seed=options['seed'],
+        )
+        self.titles = list(
+            Title.objects.filter(pk__in=dataset['titles']).values_list(
+                'pk', flat=True
+            )
+        )
+        for mode in options['modes'] or ('wsgi', 'asgi'):
+            server = self.start(mode, options)
+            try:
+                self.report(mode, self.measure(options))
+            finally:
+                server.terminate()
+                server.wait()
+
+    def start(self, mode, options):
+        url = f'http://127.0.0.1:{options["port"]}'
+        server = subprocess.Popen(
+            [
+                sys.executable, '-c', GUNICORN,
+                f'api_yamdb.{mode}:application',
+                '--bind', url[len('http://'):],
+                '--workers', str(options['workers']),
+            ],
+            cwd=settings.BASE_DIR,
+            # Every signup comes from one address: no throttling.
+            env=dict(os.environ, SERVER_MODE=mode, THROTTLE_DISABLED='true'),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.base_url = url
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'Сервер {mode} не запустился')
+            try:
+                urllib.request.urlopen(url + READ_PATHS[0]).read()
+            except OSError:
+                time.sleep(0.2)
+            else:
+                return server
+        server.terminate()
+        raise CommandError(f'Сервер {mode} не ответил за 30 с')
+
+    def measure(self, options):
+        rand = random.Random(options['seed'])
+        requests = [
+            'signup' if rand.random() < options['signup_share'] else
+            rand.choice(READ_PATHS).format(title=rand.choice(self.titles))
+            for _ in range(options['requests'])
+        ]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(self.send, requests))
+        elapsed = time.perf_counter() - start
+        return elapsed, results
+
+    def send(self, request):
+        headers = {}
+        data = None
+        if request == 'signup':
+            name = f'bench-{uuid.uuid4().hex[:12]}'
+            data = json.dumps(
+                {'username': name, 'email': f'{name}@yamdb.fake'}
+            ).encode()
+            headers = {'Content-Type': 'application/json'}
+        path = SIGNUP_PATH if request == 'signup' else request
+        http_request = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(http_request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            status = error.code
+        kind = 'signup' if request == 'signup' else 'read'
+        return kind, time.perf_counter() - start, status
+
+    def report(self, mode, result):
+        elapsed, results = result
+        errors = sum(status >= 400 for _, _, status in results)
+        line = f'{mode:<5} {len(results) / elapsed:8.1f} запр./с'
+        for kind in ('read', 'signup'):
+            timings = [timing for name, timing, _ in results if name == kind]
+            if timings:
+                line += (
+                    f'  {kind} p50 {percentile(timings, 50) * 1000:7.1f}'
+                    f' p95 {percentile(timings, 95) * 1000:7.1f} мс'
+                )
+        if errors:
+            line += f'  ошибок {errors}'
+        self.stdout.write(line)
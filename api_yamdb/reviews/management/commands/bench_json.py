@@ -0,0 +1,67 @@
+import json
+import time
+
+from api.cache import bump_version
+from api.jsonlib import orjson
+from api.renderers import JSONRenderer
+from core.synthetic import generate_dataset
+from core.utils import percentile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+PATH = '/api/v1/titles/?limit={limit}'
+
+
+class Command(BaseCommand):
+    help = ('Замеряет JSON на /titles/?limit=500 для бэкендов json и orjson: '
+            'кодирование страницы, запрос с промахом и с попаданием в кэш '
+            'ответов (p50, мс); данные удаляются после замера')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--limit', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        backends = ['json'] + (['orjson'] if orjson is not None else [])
+        with transaction.atomic():
+            generate_dataset(
+                users=20,
+                titles=options['titles'],
+                reviews_per_title=1,
+                comments_per_review=0,
+                seed=options['seed'],
+            )
+            path = PATH.format(limit=options['limit'])
+            data = json.loads(APIClient().get(path).content)
+            for backend in backends:
+                with override_settings(JSON_BACKEND=backend):
+                    self.measure(backend, path, data, options['requests'])
+            transaction.set_rollback(True)
+
+    def measure(self, backend, path, data, requests):
+        renderer = JSONRenderer()
+        render = self.get_timings(lambda: renderer.render(data), requests)
+        size = len(renderer.render(data))
+        bump_version('titles')
+        with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+            miss = self.get_timings(lambda: APIClient().get(path), requests)
+        APIClient().get(path)
+        hit = self.get_timings(lambda: APIClient().get(path), requests)
+        self.stdout.write(
+            f'{backend:<7} {size / 1024:6.0f} КБ  '
+            f'кодирование {percentile(render, 50) * 1000:7.2f}  '
+            f'промах {percentile(miss, 50) * 1000:7.2f}  '
+            f'попадание {percentile(hit, 50) * 1000:7.2f} мс'
+        )
+
+    def get_timings(self, call, requests):
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - start)
+        return timings
@@ -0,0 +1,79 @@
+import time
+
+from api.rows import RowPlan
+from api.serializers import (CommentsSerializer, ReviewSerializer,
+                             TitleReadSerializer)
+from core.synthetic import generate_dataset
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Comments, Review, Title
+
+# Parents are joined as the views get them from their routes, so the
+# serializers do not query them per object.
+SERIALIZERS = (
+    ('titles', TitleReadSerializer, lambda: Title.objects.with_related()),
+    ('reviews', ReviewSerializer, lambda: Review.objects.select_related(
+        'author', 'title'
+    ).defer('search_vector', 'title__search_vector')),
+    ('comments', CommentsSerializer,
+     lambda: Comments.objects.select_related('author', 'review')),
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает сериализаторы чтения с планами RowPlan: объектов в '
+            'секунду на страницах заданного размера, включая выборку из '
+            'базы, и совпадение JSON; данные удаляются после замера')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=500)
+        parser.add_argument('--page-size', type=int, default=500)
+        parser.add_argument('--rounds', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            generate_dataset(
+                users=50,
+                titles=options['titles'],
+                reviews_per_title=2,
+                comments_per_review=1,
+                seed=options['seed'],
+            )
+            for name, serializer_class, get_queryset in SERIALIZERS:
+                self.measure(
+                    name, serializer_class, get_queryset, options
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, name, serializer_class, get_queryset, options):
+        plan = RowPlan(serializer_class)
+
+        def serialize():
+            return serializer_class(page(), many=True).data
+
+        def serialize_rows():
+            return plan.serialize(plan.get_rows(page()))
+
+        def page():
+            return get_queryset().order_by('pk')[:options['page_size']]
+
+        same = (
+            JSONRenderer().render(serialize())
+            == JSONRenderer().render(serialize_rows())
+        )
+        before = self.get_rate(serialize, options['rounds'])
+        after = self.get_rate(serialize_rows, options['rounds'])
+        self.stdout.write(
+            f'{name:<9} {before:9.0f} -> {after:9.0f} объектов/с '
+            f'(x{after / before:.1f}), JSON '
+            + ('совпадает' if same else 'РАЗЛИЧАЕТСЯ')
+        )
+
+    def get_rate(self, serialize, rounds):
+        objects = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            objects += len(serialize())
+        return objects / (time.perf_counter() - start)
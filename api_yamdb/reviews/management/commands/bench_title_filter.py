@@ -0,0 +1,61 @@
+import statistics
+import time
+
+from api.filters import TitleFilter
+from core.synthetic import generate_catalog
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Category, Genre, Title
+
+
+class Command(BaseCommand):
+    help = ('Замеряет фильтрацию списка произведений на синтетических '
+            'данных; данные удаляются после замера')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Не удалять сгенерированные данные'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            generate_catalog(options['titles'])
+            self.stdout.write(
+                f'Сгенерировано {options["titles"]} произведений за '
+                f'{time.perf_counter() - start:.1f} с'
+            )
+            for name, params in self.get_cases():
+                timings = [
+                    self.measure(params) for _ in range(options['repeat'])
+                ]
+                self.stdout.write(
+                    f'{name:<20} медиана {statistics.median(timings):8.2f} мс'
+                    f'  минимум {min(timings):8.2f} мс'
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def get_cases(self):
+        category = Category.objects.order_by('-pk').first().slug
+        genre = Genre.objects.order_by('-pk').first().slug
+        return (
+            ('category', {'category': category}),
+            ('category_contains', {'category_contains': category[-12:]}),
+            ('genre', {'genre': genre}),
+            ('genre_contains', {'genre_contains': genre[-9:]}),
+            ('name', {'name': 'гамма'}),
+        )
+
+    def measure(self, params):
+        start = time.perf_counter()
+        queryset = TitleFilter(
+            params, queryset=Title.objects.with_related()
+        ).qs
+        queryset.count()
+        list(queryset[:settings.REST_FRAMEWORK['PAGE_SIZE']])
+        return (time.perf_counter() - start) * 1000
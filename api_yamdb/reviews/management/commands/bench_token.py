@@ -0,0 +1,61 @@
+import time
+
+from api.authentication import get_access_token
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.models import User
+
+
+class Command(BaseCommand):
+    help = ('Замеряет выдачу токенов: запросов в секунду и SQL-запросов '
+            'на /auth/token/ с верным и неверным кодом, а также стоимость '
+            'подписи токена; тестовый пользователь удаляется после замера')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(THROTTLE_RATES={}):
+            user = User.objects.create_user(
+                username='bench-token', email='bench-token@yamdb.fake',
+                role='user', confirmation_code='benchtoken'
+            )
+            client = APIClient()
+            for name, code in (('верный код', 'benchtoken'),
+                               ('неверный код', 'wrongtoken')):
+                self.measure_view(client, name, code, options['requests'])
+            self.measure_signing(
+                'RefreshToken.for_user().access_token',
+                lambda: RefreshToken.for_user(user).access_token,
+                options['requests']
+            )
+            self.measure_signing(
+                'get_access_token()',
+                lambda: get_access_token(user),
+                options['requests']
+            )
+            transaction.set_rollback(True)
+
+    def measure_view(self, client, name, code, requests):
+        data = {'username': 'bench-token', 'confirmation_code': code}
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.post('/api/v1/auth/token/', data)
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'/auth/token/, {name:<13} {requests / elapsed:8.0f} запр./с, '
+            f'{len(context.captured_queries) / requests:.1f} SQL на запрос'
+        )
+
+    def measure_signing(self, name, sign, requests):
+        start = time.perf_counter()
+        for _ in range(requests):
+            str(sign())
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{name:<37} {requests / elapsed:8.0f} токенов/с'
+        )
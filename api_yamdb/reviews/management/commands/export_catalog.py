@@ -0,0 +1,45 @@
+from api.export import CHUNK_SIZE, EXPORT_TABLES, RENDERERS, export
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = ('Выгружает произведения, отзывы или комментарии в NDJSON или '
+            'CSV без загрузки таблицы в память')
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=tuple(EXPORT_TABLES))
+        parser.add_argument(
+            '--output', choices=tuple(RENDERERS), default='ndjson'
+        )
+        parser.add_argument(
+            '--file', default=None,
+            help='Файл для выгрузки; по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--since-id', type=int, default=None,
+            help='Выгрузить только строки с id больше указанного'
+        )
+        parser.add_argument(
+            '--since', type=parse_datetime, default=None,
+            help='Выгрузить только строки с pub_date позже указанной'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        content, content_type = export(
+            options['table'],
+            output=options['output'],
+            since_id=options['since_id'],
+            since=options['since'],
+            chunk_size=options['chunk_size'],
+        )
+        if options['file'] is None:
+            self.write(content, self.stdout)
+            return
+        with open(options['file'], 'w', encoding='utf-8', newline='') as file:
+            self.write(content, file)
+
+    def write(self, content, file):
+        for chunk in content:
+            file.write(chunk)
@@ -0,0 +1,193 @@
+import csv
+import json
+import os
+import time
+
+from api.cache import bump_version
+from api.utils import gen_confirmation_code
+from core.utils import bulk_create
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from reviews.models import (Category, Comments, Genre, GenreTitle, Review,
+                            Title, User)
+
+
+def read_csv(filename):
+    with open(filename, encoding='utf-8-sig', newline='') as file:
+        yield from csv.DictReader(file)
+
+
+def read_json_lines(filename):
+    with open(filename, encoding='utf-8-sig') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json_lines,
+}
+# Tables that rows of other tables may refer to by these fields.
+NATURAL_KEYS = {
+    User: 'username',
+    Category: 'slug',
+    Genre: 'slug',
+}
+
+
+def get_value(row, *names):
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def get_fields(row, *names):
+    return {
+        name: row[name] for name in names
+        if row.get(name) not in (None, '')
+    }
+
+
+class Command(BaseCommand):
+    help = ('Загружает пользователей, категории, жанры, произведения, '
+            'отзывы и комментарии из файлов <таблица>.csv или '
+            '<таблица>.json (JSON Lines) пакетами через bulk_create')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Каталог с файлами для загрузки'
+        )
+        parser.add_argument(
+            '--format', choices=tuple(READERS), default=None,
+            help='Формат файлов; по умолчанию определяется по расширению'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одном INSERT'
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['path']):
+            raise CommandError(f'Каталог {options["path"]} не найден')
+        self.keys = {}
+        tables = (
+            ('users', User, self.build_user),
+            ('category', Category, self.build_slugged),
+            ('genre', Genre, self.build_slugged),
+            ('titles', Title, self.build_title),
+            ('genre_title', GenreTitle, self.build_genre_title),
+            ('review', Review, self.build_review),
+            ('comments', Comments, self.build_comment),
+        )
+        loaded = []
+        with transaction.atomic():
+            for table, model, build in tables:
+                rows = self.read_table(
+                    options['path'], table, options['format']
+                )
+                if rows is None:
+                    continue
+                start = time.perf_counter()
+                created = bulk_create(
+                    model,
+                    (build(model, row) for row in rows),
+                    options['batch_size']
+                )
+                elapsed = time.perf_counter() - start
+                # Read again with the new rows when next needed.
+                self.keys.pop(model, None)
+                loaded.append(model)
+                self.stdout.write(
+                    f'{table}: {created} строк за {elapsed:.2f} с '
+                    f'({created / elapsed if elapsed else 0:.0f} строк/с)'
+                )
+            self.reset_sequences(loaded)
+            Title.rebuild_ratings()
+            transaction.on_commit(
+                lambda: bump_version('categories', 'genres', 'titles')
+            )
+        self.stdout.write(self.style.SUCCESS('Каталог загружен'))
+
+    def read_table(self, path, table, file_format):
+        formats = (file_format,) if file_format else tuple(READERS)
+        for extension in formats:
+            filename = os.path.join(path, f'{table}.{extension}')
+            if os.path.exists(filename):
+                return READERS[extension](filename)
+        return None
+
+    def get_keys(self, model):
+        """Map natural keys and stringified ids of a table to ids."""
+        keys = {}
+        for pk, value in model.objects.values_list(
+            'pk', NATURAL_KEYS[model]
+        ):
+            keys[str(pk)] = pk
+            keys[value] = pk
+        return keys
+
+    def resolve(self, model, value):
+        """Id of a row referred to by id or natural key, loaded in this
+        run or already in the database."""
+        if value is None:
+            return None
+        if model not in self.keys:
+            self.keys[model] = self.get_keys(model)
+        try:
+            return self.keys[model][str(value)]
+        except KeyError:
+            raise CommandError(
+                f'{model.__name__} "{value}" не найден'
+            )
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def build_user(self, model, row):
+        return model(
+            **get_fields(
+                row, 'id', 'username', 'email', 'bio',
+                'first_name', 'last_name'
+            ),
+            role=get_value(row, 'role') or 'user',
+            password=get_value(row, 'password') or make_password(None),
+            confirmation_code=gen_confirmation_code(),
+        )
+
+    def build_slugged(self, model, row):
+        return model(**get_fields(row, 'id', 'name', 'slug'))
+
+    def build_title(self, model, row):
+        return model(
+            **get_fields(row, 'id', 'name', 'year', 'description'),
+            category_id=self.resolve(Category, get_value(row, 'category')),
+        )
+
+    def build_genre_title(self, model, row):
+        return model(
+            **get_fields(row, 'id'),
+            title_id=get_value(row, 'title_id', 'title'),
+            genre_id=self.resolve(Genre, get_value(row, 'genre_id', 'genre')),
+        )
+
+    def build_review(self, model, row):
+        return model(
+            **get_fields(row, 'id', 'text', 'score', 'pub_date'),
+            title_id=get_value(row, 'title_id', 'title'),
+            author_id=self.resolve(User, get_value(row, 'author')),
+        )
+
+    def build_comment(self, model, row):
+        return model(
+            **get_fields(row, 'id', 'text', 'pub_date'),
+            review_id=get_value(row, 'review_id', 'review'),
+            author_id=self.resolve(User, get_value(row, 'author')),
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинги лучших и обсуждаемых произведений '
+            '(общий, по категориям и по жанрам)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=None,
+            help='Количество мест в каждом рейтинге'
+        )
+        parser.add_argument(
+            '--trending-days', type=int, default=None,
+            help='Окно в днях для рейтинга обсуждаемых'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, пересчитывая с интервалом'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=300.0,
+            help='Интервал пересчёта в секундах'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            created = rebuild_leaderboard(
+                options['size'], options['trending_days']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Записано мест в рейтингах: {created} за '
+                f'{time.perf_counter() - start:.2f} с'
+            ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
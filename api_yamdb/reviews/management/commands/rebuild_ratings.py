@@ -0,0 +1,16 @@
+from api.cache import bump_version
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые рейтинги произведений по отзывам'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.rebuild_ratings()
+            transaction.on_commit(lambda: bump_version('titles'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны рейтинги произведений: {updated}'
+        ))
@@ -0,0 +1,82 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:52
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_DOCUMENTS = {
+    'reviews_title': (
+        ('name', 'A'),
+        ('description', 'B'),
+    ),
+    'reviews_review': (
+        ('text', 'A'),
+    ),
+}
+
+
+def create_search_triggers(apps, schema_editor):
+    # SQLite keeps FTS5 tables instead, see api.search.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns in SEARCH_DOCUMENTS.items():
+        document = ' || '.join(
+            f"setweight(to_tsvector('pg_catalog.russian', "
+            f"coalesce(NEW.{column}, '')), '{weight}')"
+            for column, weight in columns
+        )
+        schema_editor.execute(
+            f'CREATE FUNCTION {table}_search_vector_update() '
+            f'RETURNS trigger AS $$ BEGIN '
+            f'NEW.search_vector := {document}; RETURN NEW; '
+            f'END $$ LANGUAGE plpgsql'
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER {table}_search_vector_trigger '
+            f'BEFORE INSERT OR UPDATE OF '
+            f'{", ".join(column for column, weight in columns)} '
+            f'ON {table} FOR EACH ROW '
+            f'EXECUTE PROCEDURE {table}_search_vector_update()'
+        )
+        schema_editor.execute(
+            f'UPDATE {table} SET {columns[0][0]} = {columns[0][0]}'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {table}_search_vector_idx '
+            f'ON {table} USING gin (search_vector)'
+        )
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_DOCUMENTS:
+        schema_editor.execute(f'DROP INDEX {table}_search_vector_idx')
+        schema_editor.execute(
+            f'DROP TRIGGER {table}_search_vector_trigger ON {table}'
+        )
+        schema_editor.execute(
+            f'DROP FUNCTION {table}_search_vector_update()'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0032_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            create_search_triggers, drop_search_triggers
+        ),
+    ]
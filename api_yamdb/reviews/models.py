@@ -1,7 +1,11 @@
 from api.utils import gen_confirmation_code
-from core.models import CreatedModel
+from core.models import CreatedModel, UpdatedModel
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Prefetch, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, Now, NullIf
 
 from .validators import correct_year
 
@@ -54,6 +58,20 @@ class User(AbstractUser):
         return self.role == USER
 
 
+SCORES = range(1, 11)
+
+
+def get_score_field(score):
+    return f'score_{score}'
+
+
+def get_rating_expression(score_sum, score_count):
+    return ExpressionWrapper(
+        Cast(score_sum, FloatField()) / NullIf(score_count, 0),
+        output_field=FloatField()
+    )
+
+
 class Category(models.Model):
     name = models.CharField(
         max_length=100,
@@ -83,7 +101,27 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+def get_genre_prefetch(lookup):
+    """Prefetch of title genres in the order they were added."""
+    return Prefetch(lookup, queryset=Genre.objects.order_by('genretitle'))
+
+
+class TitleQuerySet(models.QuerySet):
+    def with_related(self):
+        """Load category and genres in bulk for nested serialization."""
+        return self.select_related('category').prefetch_related(
+            get_genre_prefetch('genre')
+        ).defer('search_vector')
+
+    def with_stats(self):
+        """Load only the stored rating aggregates and score histogram."""
+        return self.only(
+            'score_sum', 'score_count', 'rating',
+            *(get_score_field(score) for score in SCORES)
+        )
+
+
+class Title(UpdatedModel):
     name = models.CharField(
         max_length=150,
         verbose_name='Название произведения'
@@ -113,11 +151,158 @@ class Title(models.Model):
         blank=True
     )
 
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+
+    score_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False
+    )
+
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        editable=False
+    )
+
+    score_1 = models.PositiveIntegerField(
+        verbose_name='Оценок «1»',
+        default=0,
+        editable=False
+    )
+
+    score_2 = models.PositiveIntegerField(
+        verbose_name='Оценок «2»',
+        default=0,
+        editable=False
+    )
+
+    score_3 = models.PositiveIntegerField(
+        verbose_name='Оценок «3»',
+        default=0,
+        editable=False
+    )
+
+    score_4 = models.PositiveIntegerField(
+        verbose_name='Оценок «4»',
+        default=0,
+        editable=False
+    )
+
+    score_5 = models.PositiveIntegerField(
+        verbose_name='Оценок «5»',
+        default=0,
+        editable=False
+    )
+
+    score_6 = models.PositiveIntegerField(
+        verbose_name='Оценок «6»',
+        default=0,
+        editable=False
+    )
+
+    score_7 = models.PositiveIntegerField(
+        verbose_name='Оценок «7»',
+        default=0,
+        editable=False
+    )
+
+    score_8 = models.PositiveIntegerField(
+        verbose_name='Оценок «8»',
+        default=0,
+        editable=False
+    )
+
+    score_9 = models.PositiveIntegerField(
+        verbose_name='Оценок «9»',
+        default=0,
+        editable=False
+    )
+
+    score_10 = models.PositiveIntegerField(
+        verbose_name='Оценок «10»',
+        default=0,
+        editable=False
+    )
+
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
+    def get_histogram(self):
+        """Number of reviews by score, from 1 to 10."""
+        return {
+            score: getattr(self, get_score_field(score)) for score in SCORES
+        }
+
+    @classmethod
+    def update_rating(cls, title_id, old_score=None, new_score=None):
+        """Move a review score of a title from `old_score` to `new_score`.
+
+        None stands for no review, so a new review passes only
+        `new_score` and a deleted one only `old_score`.
+        """
+        if old_score == new_score:
+            return
+        score_sum = F('score_sum') + (new_score or 0) - (old_score or 0)
+        # Ints, not bools: PostgreSQL has no integer + boolean operator.
+        score_count = F('score_count') + (
+            int(new_score is not None) - int(old_score is not None)
+        )
+        changes = {}
+        if old_score is not None:
+            field = get_score_field(old_score)
+            changes[field] = F(field) - 1
+        if new_score is not None:
+            field = get_score_field(new_score)
+            changes[field] = F(field) + 1
+        cls.objects.filter(pk=title_id).update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=get_rating_expression(score_sum, score_count),
+            updated_at=Now(),
+            **changes
+        )
+
+    @classmethod
+    def rebuild_ratings(cls):
+        """Recalculate stored rating aggregates and score histograms of all
+        titles from reviews."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+
+        def count(**filters):
+            return Coalesce(Subquery(
+                reviews.filter(**filters).annotate(
+                    total=Count('pk')
+                ).values('total')
+            ), 0)
+
+        score_sum = Coalesce(Subquery(
+            reviews.annotate(total=Sum('score')).values('total')
+        ), 0)
+        score_count = count()
+        return cls.objects.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=get_rating_expression(score_sum, score_count),
+            updated_at=Now(),
+            **{get_score_field(score): count(score=score) for score in SCORES}
+        )
 
-class Review(CreatedModel):
+
+class Review(CreatedModel, UpdatedModel):
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -134,6 +319,14 @@ class Review(CreatedModel):
     score = models.PositiveSmallIntegerField(
         verbose_name='Ваша оценка'
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+
+    # Score in the database, which the title aggregates count: None for
+    # an unsaved review or one loaded without its score.
+    stored_score = None
 
     class Meta:
         constraints = [
@@ -141,6 +334,17 @@ class Review(CreatedModel):
                 fields=('title', 'author'), name='unique_title_author'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date'), name='review_title_pub_date_idx'
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        review.stored_score = review.__dict__.get('score')
+        return review
 
 
 class GenreTitle(models.Model):
@@ -153,11 +357,18 @@ class GenreTitle(models.Model):
         verbose_name='Жанр',
         on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('genre', 'title'), name='genretitle_genre_title_idx'
+            )
+        ]
+
     def __str__(self):
         return f'{self.title}, жанр : {self.genre}'
 
 
-class Comments(CreatedModel):
+class Comments(CreatedModel, UpdatedModel):
     review = models.ForeignKey(
         Review,
         on_delete=models.CASCADE,
@@ -172,3 +383,49 @@ class Comments(CreatedModel):
         on_delete=models.CASCADE,
         related_name='comments'
     )
+
+
+class LeaderboardEntry(models.Model):
+    """Row of a precomputed title ranking, rebuilt by
+    `reviews.leaderboard.rebuild_leaderboard`."""
+    TOP = 'top'
+    TRENDING = 'trending'
+    BOARDS = (
+        (TOP, 'Лучшие'),
+        (TRENDING, 'Обсуждаемые'),
+    )
+
+    board = models.CharField(
+        max_length=20,
+        choices=BOARDS,
+        verbose_name='Рейтинг'
+    )
+    category = models.SlugField(
+        max_length=50,
+        blank=True,
+        verbose_name='Категория'
+    )
+    genre = models.SlugField(
+        max_length=50,
+        blank=True,
+        verbose_name='Жанр'
+    )
+    rank = models.PositiveIntegerField(
+        verbose_name='Место'
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(
+        verbose_name='Значение'
+    )
+
+    class Meta:
+        constraints = [
+            models.constraints.UniqueConstraint(
+                fields=('board', 'category', 'genre', 'rank'),
+                name='unique_leaderboard_rank'
+            )
+        ]
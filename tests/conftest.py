@@ -1,9 +1,58 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """Run database tests on SQLite instead of the deploy Postgres, with
+    a separate 'replica' database for the replica router tests."""
+    from django.conf import settings
+    from django.db import connections
+
+    settings.DATABASES['replica'] = dict(settings.DATABASES['default'])
+    connections._databases = {
+        alias: dict(
+            database,
+            ENGINE='django.db.backends.sqlite3',
+            NAME=':memory:',
+            TEST={}
+        )
+        for alias, database in settings.DATABASES.items()
+    }
+    connections.__dict__.pop('databases', None)
+    for alias in connections:
+        if hasattr(connections._connections, alias):
+            del connections[alias]
+
+
+@pytest.fixture(autouse=True)
+def shared_caches(settings, tmp_path_factory):
+    """Use file caches, shared by processes like the caches of
+    deployments."""
+    settings.CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path_factory.mktemp(alias)),
+        }
+        for alias in settings.CACHES
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(shared_caches):
+    from django.conf import settings
+    from django.core.cache import caches
+
+    for alias in settings.CACHES:
+        caches[alias].clear()
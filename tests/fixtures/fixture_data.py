@@ -0,0 +1,82 @@
+import pytest
+
+BULK_SIZE = 500
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category
+    )
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def catalog(category, genres):
+    from reviews.models import Category, GenreTitle, Title
+
+    categories = Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(10)
+    )
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i}',
+            year=2000,
+            category=categories[i % len(categories)]
+        )
+        for i in range(BULK_SIZE)
+    )
+    titles = Title.objects.order_by('pk')
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in titles
+        for genre in genres
+    )
+    return titles
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    from reviews.models import Review, Title
+
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'author{i}', email=f'a{i}@yamdb.fake')
+        for i in range(BULK_SIZE)
+    )
+    authors = django_user_model.objects.filter(username__startswith='author')
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Текст', score=5)
+        for author in authors
+    )
+    Title.rebuild_ratings()
+    return Review.objects.filter(title=title).order_by('pk')
+
+
+@pytest.fixture
+def comments(reviews):
+    from reviews.models import Comments
+
+    review = reviews.first()
+    Comments.objects.bulk_create(
+        Comments(review=review, author=review.author, text='Комментарий')
+        for _ in range(BULK_SIZE)
+    )
+    return review.comments.all()
@@ -0,0 +1,56 @@
+import pytest
+
+
+def get_client(user):
+    from api.authentication import get_access_token
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    token = get_access_token(user)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin',
+        email='testadmin@yamdb.fake',
+        role='admin',
+        bio='admin bio'
+    )
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestModerator',
+        email='testmoder@yamdb.fake',
+        role='moderator',
+        bio='moder bio'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser',
+        email='testuser@yamdb.fake',
+        role='user',
+        bio='user bio'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    return get_client(admin)
+
+
+@pytest.fixture
+def moderator_client(moderator):
+    return get_client(moderator)
+
+
+@pytest.fixture
+def user_client(user):
+    return get_client(user)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import ASGIHandler, get_environ
+from reviews.models import Category
+
+
+async def request(application, scope, body=b''):
+    messages = [{'type': 'http.request', 'body': body}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    return sent
+
+
+def call(application, scope, body=b''):
+    return asyncio.run(request(application, scope, body))
+
+
+def get_scope(method, path, headers=()):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'headers': list(headers),
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+
+def get_response(sent):
+    start, *bodies = sent
+    assert bodies[-1] == {'type': 'http.response.body'}
+    return start['status'], dict(start['headers']), b''.join(
+        message.get('body', b'') for message in bodies
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_and_post(settings):
+    settings.EMAIL_OUTBOX_MODE = 'worker'
+    application = ASGIHandler(get_wsgi_application(), threads=2)
+    Category.objects.create(name='Книги', slug='books')
+    status, headers, body = get_response(call(
+        application, get_scope('GET', '/api/v1/categories/')
+    ))
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
+    assert [item['slug'] for item in json.loads(body)['results']] == [
+        'books'
+    ]
+    status, _, body = get_response(call(
+        application,
+        get_scope('POST', '/api/v1/auth/signup/', headers=[
+            (b'content-type', b'application/json'),
+        ]),
+        json.dumps({'username': 'asgi', 'email': 'asgi@yamdb.fake'}).encode()
+    ))
+    assert status == 200
+    assert json.loads(body) == {'username': 'asgi', 'email': 'asgi@yamdb.fake'}
+
+
+def test_requests_do_not_block_the_loop():
+    threads = []
+
+    def slow_application(environ, start_response):
+        threads.append(threading.current_thread())
+        time.sleep(0.2)
+        start_response('204 No Content', [])
+        return []
+
+    application = ASGIHandler(slow_application, threads=2)
+
+    async def timed(coroutine):
+        started = time.perf_counter()
+        await coroutine
+        return time.perf_counter() - started
+
+    async def run():
+        return await asyncio.gather(
+            timed(request(application, get_scope('GET', '/'))),
+            timed(request(application, get_scope('GET', '/'))),
+            timed(asyncio.sleep(0.01)),
+        )
+
+    timings = asyncio.run(run())
+    assert max(timings[:2]) < 0.35
+    assert timings[2] < 0.1
+    assert threading.main_thread() not in threads
+
+
+def test_lifespan():
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(ASGIHandler(lambda *args: [], threads=1)(
+        {'type': 'lifespan'}, receive, send
+    ))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_environ_headers_and_errors():
+    environ = get_environ(get_scope('GET', '/', headers=[
+        (b'cookie', b'a=1'),
+        (b'cookie', b'b=2'),
+        (b'accept', b'text/html'),
+        (b'accept', b'application/json'),
+    ]), None, 0)
+    assert environ['HTTP_COOKIE'] == 'a=1; b=2'
+    assert environ['HTTP_ACCEPT'] == 'text/html,application/json'
+    environ['wsgi.errors'].write('текст')
@@ -0,0 +1,104 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestTokenClaimsAuthentication:
+
+    def test_no_user_query(self, user_client, title,
+                           django_assert_num_queries):
+        # Validators aggregate, title with category, prefetched genres;
+        # no User lookup.
+        with django_assert_num_queries(3):
+            response = user_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+
+    def test_token_from_view_has_claims(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        response = APIClient().post('/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': user.confirmation_code
+        })
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == 'user'
+        assert token['username'] == user.username
+
+    def test_author_from_claims(self, user_client, user, title):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/', {'text': 'a', 'score': 5}
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        assert title.reviews.get().author == user
+
+    def test_role_change_applies_to_issued_token(self, user_client,
+                                                 admin_client, user):
+        url = '/api/v1/categories/'
+        data = {'name': 'Книги', 'slug': 'books'}
+        assert user_client.post(url, data).status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.post(url, data).status_code == 201
+
+    def test_deleted_user_rejected(self, user_client, user):
+        user.delete()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_token_without_claims(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
+
+    def test_process_local_cache_reads_users(self, user_client, user,
+                                             settings):
+        settings.CACHES = dict(settings.CACHES, auth={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        })
+        url = '/api/v1/categories/'
+        data = {'name': 'Книги', 'slug': 'books'}
+        # Changes made by another worker are not in this process' cache.
+        type(user).objects.filter(pk=user.pk).update(role='admin')
+        assert user_client.post(url, data).status_code == 201
+        type(user).objects.filter(pk=user.pk).update(is_active=False)
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+
+@pytest.mark.django_db
+class TestTokenView:
+    url = '/api/v1/auth/token/'
+
+    def test_single_query(self, user, django_assert_num_queries):
+        data = {'username': user.username,
+                'confirmation_code': user.confirmation_code}
+        with django_assert_num_queries(1):
+            response = APIClient().post(self.url, data)
+        assert response.status_code == 200
+
+    def test_wrong_code_not_signed(self, user, monkeypatch,
+                                   django_assert_num_queries):
+        from api import views
+
+        def fail(user):
+            raise AssertionError('Токен не должен подписываться')
+
+        monkeypatch.setattr(views, 'get_access_token', fail)
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        with django_assert_num_queries(1):
+            response = APIClient().post(self.url, data)
+        assert response.status_code == 400
+
+    def test_errors(self, user):
+        client = APIClient()
+        assert client.post(self.url, {}).status_code == 400
+        assert client.post(self.url, {
+            'username': 'nobody', 'confirmation_code': 'x'
+        }).status_code == 404
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comments, Review, Title
+
+
+@pytest.mark.django_db
+def test_bench_api_writes_report(tmp_path):
+    output = tmp_path / 'bench.json'
+    call_command(
+        'bench_api', '--users', '5', '--titles', '10', '--requests', '3',
+        '--warmup', '0', '--endpoint', 'titles-list',
+        '--endpoint', 'comments-detail', '--endpoint', 'auth-token',
+        '--endpoint', 'reviews-create', '--endpoint', 'reviews-delete',
+        '--endpoint', 'titles-create', '--endpoint', 'categories-delete',
+        '--endpoint', 'titles-bulk-create', '--endpoint', 'users-delete',
+        '--output', str(output), stdout=open(tmp_path / 'log', 'w')
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['mode'] == 'client'
+    assert set(report['endpoints']) == {
+        'titles-list', 'comments-detail', 'auth-token', 'reviews-create',
+        'reviews-delete', 'titles-create', 'categories-delete',
+        'titles-bulk-create', 'users-delete'
+    }
+    for result in report['endpoints'].values():
+        assert result['rejected'] == result['errors'] == 0
+    result = report['endpoints']['comments-detail']
+    assert result['requests'] == 3
+    assert result['errors'] == 0
+    assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+    assert result['queries_per_request'] == 3
+    assert not Title.objects.exists(), 'Данные замера должны удаляться'
+    assert not Review.objects.exists()
+    assert not Comments.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bench_api_excludes_rejected(tmp_path, monkeypatch):
+    from reviews.management.commands import bench_api
+
+    statuses = iter([200, 429] * 2)
+
+    def send_http(self, method, path, role, data, options):
+        status = next(statuses)
+        return (1 if status == 429 else 0.001), status, None
+
+    monkeypatch.setattr(bench_api.Command, 'send_http', send_http)
+    output = tmp_path / 'bench.json'
+    call_command(
+        'bench_api', '--users', '5', '--titles', '10', '--requests', '4',
+        '--warmup', '0', '--endpoint', 'metrics', '--base-url',
+        'http://testserver', '--output', str(output),
+        stdout=open(tmp_path / 'log', 'w')
+    )
+    result = json.loads(output.read_text(encoding='utf-8'))['endpoints'][
+        'metrics'
+    ]
+    assert result['requests'] == 4
+    assert result['rejected'] == 2
+    assert result['p99_ms'] == 1
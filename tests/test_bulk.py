@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import GenreTitle, Title
+
+URL = '/api/v1/titles/bulk/'
+
+
+def get_items(count, category='films', genre=('drama', 'comedy')):
+    return [
+        {
+            'name': f'Сезон {i}',
+            'year': 2001,
+            'category': category,
+            'genre': list(genre),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestTitlesBulk:
+
+    def test_only_admin(self, user_client, category, genres):
+        response = APIClient().post(URL, get_items(1), format='json')
+        assert response.status_code == 401
+        response = user_client.post(URL, get_items(1), format='json')
+        assert response.status_code == 403
+
+    def test_bulk_create(self, admin_client, category, genres):
+        response = admin_client.post(URL, get_items(3), format='json')
+        assert response.status_code == 201, response.json()
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Сезон 0', 'Сезон 1', 'Сезон 2'
+        ]
+        assert data[0]['category']['slug'] == 'films'
+        assert {genre['slug'] for genre in data[0]['genre']} == {
+            'drama', 'comedy'
+        }
+        assert Title.objects.count() == 3
+        assert GenreTitle.objects.count() == 6
+
+    def test_per_item_errors_write_nothing(self, admin_client, category,
+                                           genres):
+        items = get_items(3)
+        items[1]['genre'] = ['drama', 'horror']
+        items[2]['year'] = 3000
+        response = admin_client.post(URL, items, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert list(errors[1]) == ['genre']
+        assert list(errors[2]) == ['year']
+        assert not Title.objects.exists()
+
+    def test_not_a_list(self, admin_client):
+        response = admin_client.post(URL, {'name': 'Сезон'}, format='json')
+        assert response.status_code == 400
+
+    def test_bulk_update(self, admin_client, title, category, genres):
+        response = admin_client.patch(URL, [
+            {'id': title.id, 'year': 1995, 'genre': ['comedy']},
+            {'id': 0, 'name': 'Нет такого'},
+        ], format='json')
+        assert response.status_code == 400
+        assert list(response.json()[1]) == ['id']
+
+        response = admin_client.patch(
+            URL, [{'id': title.id, 'year': 1995, 'genre': ['comedy']}],
+            format='json'
+        )
+        assert response.status_code == 200
+        title.refresh_from_db()
+        assert title.year == 1995
+        assert title.name == 'Побег из Шоушенка'
+        assert list(title.genre.values_list('slug', flat=True)) == ['comedy']
+
+    def test_update_queries_do_not_grow(self, admin_client, catalog):
+        counts = []
+        for size in (5, 50):
+            items = [
+                {'id': title.id, 'year': 1999, 'genre': ['drama']}
+                for title in catalog[:size]
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.patch(URL, items, format='json')
+            assert response.status_code == 200
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_cache_invalidated(admin_client, category, genres):
+    admin_client.get('/api/v1/titles/')
+    admin_client.post(URL, get_items(2), format='json')
+    response = admin_client.get('/api/v1/titles/')
+    assert response.json()['count'] == 2
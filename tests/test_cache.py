@@ -0,0 +1,71 @@
+import pytest
+
+
+@pytest.fixture
+def response_cache():
+    from api.cache import get_cache
+    return get_cache()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_hit_and_miss(self, client, title, response_cache):
+        from api.cache import get_stats
+
+        url = f'/api/v1/titles/{title.id}/'
+        first = client.get(url)
+        second = client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert first.json() == second.json()
+        assert get_stats() == {'hits': 1, 'misses': 1}
+
+    def test_review_invalidates_titles(self, client, user_client, title,
+                                       response_cache):
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+        user_client.post(
+            f'{url}reviews/', {'text': 'Хорошо', 'score': 7}
+        )
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7
+
+    def test_catalog_writes_invalidate(self, client, admin_client, title,
+                                       response_cache):
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/titles/')
+        admin_client.post(
+            '/api/v1/categories/', {'name': 'Книги', 'slug': 'books'}
+        )
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS'
+        assert 'books' in [item['slug'] for item in response.json()['results']]
+
+        admin_client.patch(
+            f'/api/v1/titles/{title.id}/', {'genre': ['drama']}
+        )
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+
+    def test_neutral_cached_copy(self, client, title, response_cache):
+        url = f'/api/v1/titles/{title.id}/'
+        client.get(url, HTTP_ACCEPT='application/json; indent=4')
+        response = client.get(url)
+        assert response['X-Cache'] == 'HIT'
+        assert b'\n' not in response.content
+
+    def test_off_for_process_local_cache(self, client, admin_client, title,
+                                         settings):
+        settings.CACHES = dict(settings.CACHES, default={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        })
+        url = f'/api/v1/titles/{title.id}/'
+        response = client.get(url)
+        assert 'X-Cache' not in response
+        assert 'ETag' not in response
+        assert 'ETag' not in client.get('/api/v1/titles/')
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from django.utils.http import http_date
+
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def get_url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/'
+
+    def test_not_modified_after_one_query(self, client, title, reviews,
+                                          django_assert_num_queries):
+        response = client.get(self.get_url(title))
+        assert response.status_code == 200
+        etag = response['ETag']
+        with django_assert_num_queries(1):
+            response = client.get(
+                self.get_url(title), HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert not response.content
+
+    def test_if_modified_since(self, client, title, reviews):
+        url = f'{self.get_url(title)}{reviews.first().id}/'
+        response = client.get(url)
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    def test_lists_are_not_dated(self, client, title, reviews):
+        assert 'Last-Modified' not in client.get(self.get_url(title))
+        assert 'Last-Modified' not in client.get(f'/api/v1/titles/{title.id}/')
+
+    def test_delete_after_if_modified_since(self, client, title, reviews):
+        since = http_date(time.time() + 60)
+        Review.objects.filter(pk=reviews.last().pk).delete()
+        response = client.get(
+            self.get_url(title), HTTP_IF_MODIFIED_SINCE=since
+        )
+        assert response.status_code == 200
+        assert response.json()['count'] == reviews.count()
+
+    def test_changes_update_etag(self, client, title, reviews):
+        etag = client.get(self.get_url(title))['ETag']
+        review = reviews.first()
+        review.text = 'Изменённый отзыв'
+        review.save()
+        response = client.get(self.get_url(title), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        changed = response['ETag']
+        assert changed != etag
+
+        Review.objects.filter(pk=reviews.last().pk).delete()
+        response = client.get(self.get_url(title), HTTP_IF_NONE_MATCH=changed)
+        assert response.status_code == 200
+
+    def test_comments_and_detail(self, client, title, comments):
+        comment = comments.first()
+        for url in (
+            f'/api/v1/titles/{title.id}/reviews/{comment.review_id}/'
+            'comments/',
+            f'/api/v1/titles/{title.id}/reviews/{comment.review_id}/'
+            f'comments/{comment.id}/',
+            f'/api/v1/titles/{title.id}/',
+        ):
+            etag = client.get(url)['ETag']
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, url
+
+    def test_missing_object(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id + 1}/')
+        assert response.status_code == 404
+        assert 'ETag' not in response
+
+    def test_invalid_id(self, client, title, comments):
+        review_id = comments.first().review_id
+        for url in (
+            '/api/v1/titles/abc/',
+            f'/api/v1/titles/{title.id}/reviews/abc/',
+            f'/api/v1/titles/{title.id}/reviews/{review_id}/comments/abc/',
+        ):
+            assert client.get(url).status_code == 404, url
+
+
+@pytest.mark.django_db(transaction=True)
+def test_title_etag_follows_genre_rename(client, title, genres):
+    url = f'/api/v1/titles/{title.id}/'
+    etag = client.get(url)['ETag']
+    genres[0].name = 'Трагедия'
+    genres[0].save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,128 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection
+
+from core import db
+from core.backends.sqlite3.base import DatabaseWrapper
+
+
+@pytest.fixture
+def make_wrapper(tmp_path):
+    """Wrappers of a file SQLite database behind one pool per test."""
+    alias = f'pool-{tmp_path.name}'
+    wrappers = []
+
+    def make_wrapper(**pool):
+        wrapper = DatabaseWrapper(dict(
+            connection.settings_dict,
+            ENGINE='core.backends.sqlite3',
+            NAME=str(tmp_path / 'db.sqlite3'),
+            HEALTH_CHECKS=True,
+            POOL=dict({'SIZE': 2, 'TIMEOUT': 0.1, 'MAX_AGE': 600}, **pool),
+        ), alias=alias)
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make_wrapper
+    for wrapper in wrappers:
+        wrapper.close()
+    wrappers[0].pool.clear()
+
+
+def get_events(alias):
+    return {
+        event: value for (key, event), value in db.get_stats().items()
+        if key == alias
+    }
+
+
+def query(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        return cursor.fetchone()
+
+
+@pytest.mark.django_db
+def test_reuse(make_wrapper):
+    wrapper = make_wrapper()
+    assert query(wrapper) == (1,)
+    first = wrapper.connection
+    wrapper.close()
+    assert query(wrapper) == (1,)
+    assert wrapper.connection is first
+    assert get_events(wrapper.alias) == {'opened': 1, 'reused': 1}
+
+
+@pytest.mark.django_db
+def test_pool_is_bounded(make_wrapper):
+    first, second, third = make_wrapper(), make_wrapper(), make_wrapper()
+    query(first)
+    query(second)
+    with pytest.raises(OperationalError):
+        query(third)
+    first.close()
+    query(third)
+    assert get_events(first.alias) == {
+        'opened': 2, 'reused': 1, 'timeout': 1
+    }
+
+
+@pytest.mark.django_db
+def test_expired_unhealthy_and_failed(make_wrapper):
+    wrapper = make_wrapper(MAX_AGE=0)
+    query(wrapper)
+    wrapper.close()
+    wrapper.pool.max_age = None
+    query(wrapper)
+    wrapper.close()
+    wrapper.pool.idle[-1].close()
+    query(wrapper)
+    wrapper.errors_occurred = True
+    wrapper.close()
+    assert not wrapper.pool.idle
+    assert get_events(wrapper.alias) == {
+        'opened': 3, 'expired': 1, 'health_check_failed': 1,
+        'discarded': 1,
+    }
+
+
+@pytest.mark.django_db
+def test_persistent_connection_checks(client, monkeypatch):
+    from api.metrics import render_prometheus
+
+    client.get('/api/v1/categories/')
+    before = get_events('default')
+    client.get('/api/v1/categories/')
+    after = get_events('default')
+    assert after['reused'] == before['reused'] + 1
+    monkeypatch.setattr(connection, 'is_usable', lambda: False)
+    client.get('/api/v1/categories/')
+    assert get_events('default')['health_check_failed'] == 1
+    assert (
+        'yamdb_db_connections_total{alias="default",event="reused"}'
+        in render_prometheus()
+    )
+
+
+@pytest.mark.parametrize('engine, pooled', [
+    ('django.db.backends.postgresql', 'core.backends.postgresql'),
+    ('core.backends.postgresql', 'core.backends.postgresql'),
+    ('django.db.backends.sqlite3', 'core.backends.sqlite3'),
+])
+def test_pool_size_picks_pool_engine(monkeypatch, engine, pooled):
+    import importlib
+
+    from api_yamdb import settings
+
+    monkeypatch.setenv('DB_ENGINE', engine)
+    monkeypatch.setenv('DB_POOL_SIZE', '4')
+    try:
+        assert importlib.reload(settings).DATABASES['default'][
+            'ENGINE'
+        ] == pooled
+        monkeypatch.setenv('DB_ENGINE', 'django.db.backends.mysql')
+        with pytest.raises(ImproperlyConfigured):
+            importlib.reload(settings)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(settings)
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_admin_only(self, user_client, client):
+        assert user_client.get('/api/v1/export/reviews/').status_code == 403
+        assert client.get('/api/v1/export/reviews/').status_code == 401
+
+    def test_unknown_table(self, admin_client):
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+
+    def test_reviews_ndjson(self, admin_client, title, reviews):
+        response = admin_client.get('/api/v1/export/reviews/')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert [row['id'] for row in rows] == list(
+            reviews.values_list('id', flat=True)
+        )
+        assert rows[0]['author'] == reviews.first().author.username
+
+    def test_titles_csv_since_id(self, admin_client, catalog):
+        watermark = catalog[100].id
+        response = admin_client.get(
+            f'/api/v1/export/titles/?output=csv&since_id={watermark}'
+        )
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        assert len(rows) == catalog.filter(id__gt=watermark).count()
+        assert rows[0]['name'] == catalog.get(id=watermark + 1).name
+
+    def test_invalid_params(self, admin_client):
+        response = admin_client.get('/api/v1/export/titles/?output=xml')
+        assert response.status_code == 400
+
+    def test_command(self, title, reviews, tmp_path):
+        filename = tmp_path / 'reviews.ndjson'
+        since_id = reviews[9].id
+        call_command(
+            'export_catalog', 'reviews', file=str(filename),
+            since_id=since_id, chunk_size=7
+        )
+        rows = [json.loads(line) for line in open(filename)]
+        assert len(rows) == reviews.filter(id__gt=since_id).count()
@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    def get_names(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_slug_filters_are_exact(self, client, title, genres):
+        from reviews.models import Category, Title
+
+        other = Title.objects.create(
+            name='Другое', year=2000,
+            category=Category.objects.create(name='Мульт', slug='films-kids')
+        )
+        other.genre.set([genres[0]])
+        assert self.get_names(client, 'category=films') == [title.name]
+        assert self.get_names(client, 'category=film') == []
+        assert self.get_names(client, 'genre=comedy') == [title.name]
+
+    def test_contains_filters(self, client, title):
+        assert self.get_names(client, 'category_contains=ILM') == [title.name]
+        assert self.get_names(client, 'genre_contains=dra') == [title.name]
+        assert self.get_names(client, 'name=Шоушен') == [title.name]
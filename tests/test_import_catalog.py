@@ -0,0 +1,117 @@
+import csv
+import json
+
+import pytest
+from django.core.management import call_command
+
+CSV_TABLES = {
+    'users': [
+        {'id': 10, 'username': 'reader', 'email': 'reader@yamdb.fake',
+         'role': 'user'},
+        {'id': 11, 'username': 'critic', 'email': 'critic@yamdb.fake',
+         'role': 'moderator'},
+    ],
+    'category': [{'id': 1, 'name': 'Фильм', 'slug': 'movie'}],
+    'genre': [
+        {'id': 1, 'name': 'Драма', 'slug': 'drama'},
+        {'id': 2, 'name': 'Комедия', 'slug': 'comedy'},
+    ],
+    'titles': [
+        {'id': 5, 'name': 'Дурак', 'year': 2014, 'category': 'movie'},
+        {'id': 6, 'name': 'Кин-дза-дза!', 'year': 1986, 'category': ''},
+    ],
+    'genre_title': [
+        {'title_id': 5, 'genre_id': 'drama'},
+        {'title_id': 6, 'genre_id': 'comedy'},
+        {'title_id': 5, 'genre_id': 2},
+    ],
+}
+
+JSON_TABLES = {
+    'review': [
+        {'id': 1, 'title_id': 5, 'text': 'Сильно', 'author': 'reader',
+         'score': 9, 'pub_date': '2022-06-01T10:00:00Z'},
+        {'id': 2, 'title_id': 5, 'text': 'Мрачно', 'author': 11,
+         'score': 6, 'pub_date': '2022-06-02T10:00:00Z'},
+    ],
+    'comments': [
+        {'id': 1, 'review_id': 1, 'text': 'Согласен', 'author': 'critic',
+         'pub_date': '2022-06-03T10:00:00Z'},
+    ],
+}
+
+
+@pytest.fixture
+def catalog_dir(tmp_path):
+    for table, rows in CSV_TABLES.items():
+        with open(tmp_path / f'{table}.csv', 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    for table, rows in JSON_TABLES.items():
+        with open(tmp_path / f'{table}.json', 'w') as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestImportCatalog:
+
+    def test_import(self, catalog_dir, django_user_model):
+        from reviews.models import Comments, GenreTitle, Title
+
+        call_command(
+            'import_catalog', str(catalog_dir), batch_size=1,
+            stdout=open('/dev/null', 'w')
+        )
+        assert django_user_model.objects.count() == 2
+        title = Title.objects.get(pk=5)
+        assert title.category.slug == 'movie'
+        assert Title.objects.get(pk=6).category is None
+        assert GenreTitle.objects.count() == 3
+        assert (title.score_sum, title.score_count) == (15, 2)
+        assert Comments.objects.get().author.username == 'critic'
+
+        created = Title.objects.create(name='Новое', year=2020)
+        assert created.pk == 7
+
+    def test_import_into_existing_catalog(self, catalog_dir, user):
+        from reviews.models import Category, Genre, Review, Title
+
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.bulk_create([
+            Genre(name='Драма', slug='drama'),
+            Genre(name='Комедия', slug='comedy'),
+        ])
+        for table in ('users.csv', 'category.csv', 'genre.csv',
+                      'comments.json'):
+            (catalog_dir / table).unlink()
+        with open(catalog_dir / 'review.json', 'w') as file:
+            file.write(json.dumps({
+                'id': 1, 'title_id': 5, 'text': 'Сильно',
+                'author': user.username, 'score': 9,
+            }) + '\n')
+        call_command(
+            'import_catalog', str(catalog_dir),
+            stdout=open('/dev/null', 'w')
+        )
+        title = Title.objects.get(pk=5)
+        assert title.category.slug == 'movie'
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+        assert Review.objects.get().author == user
+
+    def test_unknown_slug(self, catalog_dir):
+        from django.core.management.base import CommandError
+        from reviews.models import Title
+
+        with open(catalog_dir / 'titles.csv', 'a') as file:
+            file.write('7,Сталкер,1979,unknown\n')
+        with pytest.raises(CommandError):
+            call_command(
+                'import_catalog', str(catalog_dir),
+                stdout=open('/dev/null', 'w')
+            )
+        assert not Title.objects.exists()
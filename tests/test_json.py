@@ -0,0 +1,100 @@
+import datetime
+import decimal
+from collections import OrderedDict
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers
+
+from api.jsonlib import Fragment, dumps, orjson
+
+BACKENDS = (
+    'json',
+    pytest.param('orjson', marks=pytest.mark.skipif(
+        orjson is None, reason='orjson не установлен'
+    )),
+)
+
+DATA = OrderedDict(
+    name='Побег из Шоушенка',
+    pub_date=datetime.datetime(
+        2022, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc
+    ),
+    rating=decimal.Decimal('7.5'),
+    histogram={1: 0, 10: 2},
+    genre=[{'slug': 'drama'}, {'slug': 'comedy'}],
+    category=None,
+    text='строка\u2028абзац\u2029',
+    lazy=gettext_lazy('Ваш отзыв'),
+    tags=('a', 'b'),
+)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, settings):
+    settings.JSON_BACKEND = request.param
+    return request.param
+
+
+@pytest.mark.parametrize('media_type', (
+    'application/json', 'application/json; indent=4'
+))
+def test_same_as_drf(backend, media_type):
+    from api.renderers import JSONRenderer
+
+    assert JSONRenderer().render(DATA, media_type) == (
+        renderers.JSONRenderer().render(DATA, media_type)
+    )
+
+
+def test_fragments(backend):
+    content = dumps({'page': Fragment(b'[1,{"a":"\xd1\x8f"}]'), 'b': 'б'})
+    assert content == '{"page":[1,{"a":"я"}],"b":"б"}'.encode()
+    assert dumps(Fragment(b'{}')) == b'{}'
+
+
+@pytest.mark.django_db
+class TestJSONParser:
+
+    def test_parse(self, backend, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', {'name': 'Книги', 'slug': 'books'},
+            format='json'
+        )
+        assert response.status_code == 201
+        assert response.json() == {'name': 'Книги', 'slug': 'books'}
+
+    def test_parse_error(self, backend, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', '{"name": NaN}',
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert response.json()['detail'].startswith('JSON parse error')
+
+
+@pytest.mark.django_db
+def test_cache_hit_content(backend, client, title):
+    first = client.get('/api/v1/titles/?limit=50')
+    second = client.get('/api/v1/titles/?limit=50')
+    assert second['X-Cache'] == 'HIT'
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_bench_json(tmp_path):
+    from reviews.models import Title
+
+    output = tmp_path / 'log'
+    call_command(
+        'bench_json', '--titles', '5', '--limit', '5', '--requests', '2',
+        stdout=open(output, 'w')
+    )
+    backends = [
+        line.split()[0]
+        for line in output.read_text(encoding='utf-8').splitlines()
+    ]
+    assert backends == ['json'] + (['orjson'] if orjson else [])
+    assert not Title.objects.exists(), 'Данные замера должны удаляться'
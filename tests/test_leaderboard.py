@@ -0,0 +1,75 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Genre, LeaderboardEntry, Review, Title
+
+URL = '/api/v1/leaderboard/'
+
+
+@pytest.fixture
+def ranked(category, genres, django_user_model):
+    users = [
+        django_user_model.objects.create_user(
+            username=f'critic{i}', email=f'critic{i}@yamdb.fake',
+            role='user'
+        )
+        for i in range(5)
+    ]
+    titles = [
+        Title.objects.create(name=name, year=2000, category=category)
+        for name in ('Лучший', 'Один отзыв', 'Средний')
+    ]
+    titles[0].genre.set(genres[:1])
+    titles[1].genre.set(genres)
+    scores = ([9, 9, 10, 9, 10], [10], [5, 6, 5])
+    for title, title_scores in zip(titles, scores):
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='Отзыв', score=score)
+            for user, score in zip(users, title_scores)
+        )
+    Title.rebuild_ratings()
+    call_command('rebuild_leaderboard', stdout=open('/dev/null', 'w'))
+    return titles
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+
+    def get_names(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, response.json()
+        return [entry['title']['name'] for entry in response.json()]
+
+    def test_top(self, client, ranked):
+        assert self.get_names(client, f'{URL}top/') == [
+            'Лучший', 'Один отзыв', 'Средний'
+        ], 'Один высокий отзыв не должен поднимать произведение на вершину'
+        response = client.get(f'{URL}top/?limit=1&offset=1').json()
+        assert [entry['rank'] for entry in response] == [2]
+
+    def test_scopes(self, client, ranked, genres):
+        assert self.get_names(client, f'{URL}top/?genre=comedy') == [
+            'Один отзыв'
+        ]
+        assert len(self.get_names(client, f'{URL}top/?category=films')) == 3
+        response = client.get(f'{URL}top/?genre=comedy&category=films')
+        assert response.status_code == 400
+
+    def test_trending(self, client, ranked):
+        assert self.get_names(client, f'{URL}trending/') == [
+            'Лучший', 'Средний', 'Один отзыв'
+        ]
+
+    def test_read_is_range_scan(self, client, ranked,
+                                django_assert_num_queries):
+        # Entries with titles and categories, prefetched genres.
+        with django_assert_num_queries(2):
+            client.get(f'{URL}top/')
+
+    def test_rebuild_replaces_rows(self, ranked):
+        Genre.objects.filter(slug='comedy').delete()
+        call_command('rebuild_leaderboard', stdout=open('/dev/null', 'w'))
+        assert not LeaderboardEntry.objects.filter(genre='comedy').exists()
+
+    def test_unknown_board(self, client):
+        assert client.get(f'{URL}worst/').status_code == 404
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+
+import pytest
+
+from api import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+
+def get_line(text, start):
+    return next(line for line in text.splitlines() if line.startswith(start))
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_metrics_admin_only(self, client, user_client):
+        assert client.get('/api/v1/metrics/').status_code == 401
+        assert user_client.get('/api/v1/metrics/').status_code == 403
+
+    def test_route_histograms(self, admin_client, title):
+        admin_client.get('/api/v1/titles/')
+        admin_client.get(f'/api/v1/titles/{title.id}/')
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert get_line(
+            text, 'yamdb_request_seconds_count{route="title-list"}'
+        ).endswith(' 1')
+        assert get_line(
+            text, 'yamdb_db_queries_bucket{route="title-detail",le="+Inf"}'
+        ).endswith(' 1')
+        queries = float(get_line(
+            text, 'yamdb_db_queries_sum{route="title-list"}'
+        ).split()[-1])
+        assert queries == 3
+        assert 'yamdb_response_bytes_sum{route="title-list"}' in text
+        assert 'yamdb_serialize_seconds_sum{route="title-list"}' in text
+        assert 'yamdb_response_cache_total{result="misses"}' in text
+
+    def test_serialize_seconds_count_serializers(self, admin_client,
+                                                 title, monkeypatch):
+        from api.rows import RowPlan
+
+        serialize = RowPlan.serialize
+
+        def slow_serialize(self, rows):
+            time.sleep(0.05)
+            return serialize(self, rows)
+
+        monkeypatch.setattr(RowPlan, 'serialize', slow_serialize)
+        admin_client.get('/api/v1/titles/')
+        seconds = float(get_line(
+            metrics.render_prometheus(),
+            'yamdb_serialize_seconds_sum{route="title-list"}'
+        ).split()[-1])
+        assert seconds >= 0.05
+
+    def test_sampling_disabled(self, admin_client, settings):
+        settings.METRICS_SAMPLE_RATE = 0
+        admin_client.get('/api/v1/categories/')
+        assert 'route="category-list"' not in metrics.render_prometheus()
+
+
+def test_log_linear_bounds():
+    assert metrics.log_linear_bounds(1, 8) == [1.5, 2, 3, 4, 6, 8]
+
+
+@pytest.mark.django_db
+def test_metrics_summed_over_workers(admin_client, settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    bounds = metrics.METRICS['db_queries'][1]
+    (tmp_path / '1.json').write_text(json.dumps({
+        'histograms': [
+            ['db_queries', 'category-list', [1] + [0] * len(bounds), 1, 1]
+        ],
+        'throttle': [['signup_ip', 'allowed', 2]],
+        'db': [],
+    }))
+    admin_client.get('/api/v1/categories/')
+    assert os.path.exists(tmp_path / f'{os.getpid()}.json')
+    text = admin_client.get('/api/v1/metrics/').content.decode()
+    assert get_line(
+        text, 'yamdb_db_queries_count{route="category-list"}'
+    ).endswith(' 2')
+    assert get_line(
+        text, 'yamdb_throttle_requests_total{scope="signup_ip"'
+    ).endswith(' 2')
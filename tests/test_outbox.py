@@ -0,0 +1,114 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+def signup(client, number):
+    return client.post('/api/v1/auth/signup/', {
+        'email': f'new{number}@yamdb.fake', 'username': f'new{number}'
+    })
+
+
+@pytest.fixture
+def worker_mode(settings):
+    settings.EMAIL_OUTBOX_MODE = 'worker'
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_enqueues(self, client, worker_mode):
+        from core.mail import drain_outbox
+        from core.models import OutgoingEmail
+
+        assert signup(client, 1).status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что письмо не отправляется во время запроса'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'new1@yamdb.fake'
+
+        assert drain_outbox() == 1
+        assert mail.outbox[0].to == ['new1@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+        assert drain_outbox() == 0
+
+    def test_batches(self, client, worker_mode):
+        from core.mail import drain_outbox
+
+        for number in range(5):
+            signup(client, number)
+        assert drain_outbox(batch_size=2) == 2
+        assert len(mail.outbox) == 2
+        assert drain_outbox(batch_size=10) == 3
+
+    def test_retry_with_backoff(self, client, worker_mode, settings):
+        from core.mail import drain_outbox
+        from core.models import OutgoingEmail
+        from django.utils import timezone
+
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        signup(client, 1)
+        assert drain_outbox() == 1
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None and email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt_at > timezone.now()
+        assert drain_outbox() == 0, 'Повтор должен ждать окончания паузы'
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert drain_outbox() == 1
+        assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_thread_mode(client, settings):
+    from core import mail as outbox
+    from core.models import OutgoingEmail
+
+    settings.EMAIL_OUTBOX_MODE = 'thread'
+    assert signup(client, 1).status_code == 200
+    outbox._queued.result(timeout=5)
+    assert OutgoingEmail.objects.get().sent_at is not None
+    assert len(mail.outbox) == 1
+
+
+class FlakyBackend(BaseEmailBackend):
+    """Fails the first send only."""
+    failures = 1
+
+    def send_messages(self, email_messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise ConnectionError('SMTP недоступен')
+        mail.outbox.extend(email_messages)
+        return len(email_messages)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_thread_mode_retries(client, settings):
+    from core import mail as outbox
+    from core.models import OutgoingEmail
+
+    settings.EMAIL_OUTBOX_MODE = 'thread'
+    settings.EMAIL_OUTBOX_RETRY_DELAY = 0.2
+    settings.EMAIL_BACKEND = 'tests.test_outbox.FlakyBackend'
+    signup(client, 1)
+    outbox._queued.result(timeout=5)
+    email = OutgoingEmail.objects.get()
+    assert email.sent_at is None and email.attempts == 1
+    assert outbox._timer is not None, (
+        'Проверьте, что повтор запланирован без новых писем'
+    )
+    outbox._timer.join(timeout=5)
+    outbox._queued.result(timeout=5)
+    email.refresh_from_db()
+    assert email.sent_at is not None and email.attempts == 2
+    assert len(mail.outbox) == 1
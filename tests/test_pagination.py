@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def walk(client, url):
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        results.extend(data['results'])
+        url = data['next']
+    return results
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_limit_offset_unchanged(self, client, title, reviews):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        data = response.json()
+        assert set(data) == {'count', 'next', 'previous', 'results'}
+        assert data['count'] == reviews.count()
+        assert len(data['results']) == 5
+
+    def test_reviews_cursor(self, client, title, reviews):
+        url = (f'/api/v1/titles/{title.id}/reviews/'
+               '?pagination=cursor&limit=100')
+        response = client.get(url)
+        assert set(response.json()) == {'next', 'previous', 'results'}, (
+            'Проверьте, что в режиме курсора ответ не содержит count'
+        )
+        ids = [review['id'] for review in walk(client, url)]
+        assert ids == list(
+            reviews.order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+
+    def test_titles_cursor(self, client, catalog):
+        ids = [
+            title['id'] for title in
+            walk(client, '/api/v1/titles/?pagination=cursor&limit=50')
+        ]
+        assert ids == list(catalog.values_list('id', flat=True))
+
+    def test_comments_cursor_without_count(self, client, title, comments):
+        review = comments.first().review
+        url = (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+               '?pagination=cursor&limit=100')
+        with CaptureQueriesContext(connection) as context:
+            results = walk(client, url)
+        assert len(results) == comments.count()
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        )
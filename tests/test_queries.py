@@ -0,0 +1,59 @@
+import pytest
+
+from .fixtures.fixture_data import BULK_SIZE
+
+PAGE_SIZES = (5, 50, BULK_SIZE)
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    @pytest.mark.parametrize('limit', PAGE_SIZES)
+    def test_titles_list(self, client, catalog, limit,
+                         django_assert_num_queries):
+        # Validators with the count, titles with categories, genres.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit
+
+    def test_title_detail(self, client, title, django_assert_num_queries):
+        # Validators, title with category, prefetched genres.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('limit', PAGE_SIZES)
+    def test_reviews_list(self, client, title, reviews, limit,
+                          django_assert_num_queries):
+        # Title, validators with the count, reviews with authors.
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{title.id}/reviews/?limit={limit}'
+            )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit
+
+    @pytest.mark.parametrize('limit', PAGE_SIZES)
+    def test_comments_list(self, client, title, comments, limit,
+                           django_assert_num_queries):
+        review = comments.first().review
+        # Review with title, validators with the count, comments.
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+                f'?limit={limit}'
+            )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit
+
+    def test_comment_detail(self, client, title, comments,
+                            django_assert_num_queries):
+        comment = comments.first()
+        # Validators, review joined with title, comment.
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{title.id}/reviews/{comment.review_id}/'
+                f'comments/{comment.id}/'
+            )
+        assert response.status_code == 200
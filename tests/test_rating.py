@@ -0,0 +1,128 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleRating:
+    reviews_url = '/api/v1/titles/{title_id}/reviews/'
+
+    def get_rating(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        return response.json()['rating']
+
+    def test_rating_follows_reviews(self, title, user_client, admin_client):
+        url = self.reviews_url.format(title_id=title.id)
+        assert self.get_rating(user_client, title) is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен None'
+        )
+
+        response = user_client.post(url, {'text': 'Хорошо', 'score': 7})
+        assert response.status_code == 201
+        review_id = response.json()['id']
+        admin_client.post(url, {'text': 'Отлично', 'score': 10})
+        assert self.get_rating(user_client, title) == 8
+
+        user_client.patch(f'{url}{review_id}/', {'score': 2})
+        assert self.get_rating(user_client, title) == 6
+
+        admin_client.delete(f'{url}{review_id}/')
+        assert self.get_rating(user_client, title) == 10
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (10, 1)
+
+    def test_cascade_deletes(self, title, user, user_client, admin_client):
+        url = self.reviews_url.format(title_id=title.id)
+        user_client.post(url, {'text': 'Отлично', 'score': 9})
+        admin_client.post(url, {'text': 'Хорошо', 'score': 6})
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (6, 1)
+        assert title.rating == 6
+        stats = admin_client.get(f'/api/v1/titles/{title.id}/stats/').json()
+        assert stats['count'] == 1
+        assert stats['median'] == 6
+        assert stats['histogram']['9'] == 0
+        assert stats['histogram']['6'] == 1
+
+        title.reviews.all().delete()
+        stats = admin_client.get(f'/api/v1/titles/{title.id}/stats/').json()
+        assert stats['count'] == 0
+        assert stats['median'] is None
+        assert not any(stats['histogram'].values())
+
+    def test_update_params_are_not_bools(self, title):
+        from django.db import connection
+        from reviews.models import Title
+
+        params = []
+
+        def capture(execute, sql, sql_params, many, context):
+            params.extend(sql_params)
+            return execute(sql, sql_params, many, context)
+
+        with connection.execute_wrapper(capture):
+            Title.update_rating(title.id, new_score=7)
+            Title.update_rating(title.id, old_score=7)
+        assert params
+        assert not any(isinstance(param, bool) for param in params)
+
+    def test_rebuild_ratings(self, title, user, admin):
+        from reviews.models import Review
+
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='a', score=3),
+            Review(title=title, author=admin, text='b', score=6),
+        ])
+        title.refresh_from_db()
+        assert title.score_count == 0
+
+        call_command('rebuild_ratings', stdout=open('/dev/null', 'w'))
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (9, 2)
+        assert title.rating == 4.5
+        assert title.get_histogram()[3] == 1
+        assert title.get_histogram()[6] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleStats:
+
+    def test_histogram_follows_reviews(self, title, user_client,
+                                       admin_client, moderator_client):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review_id = user_client.post(
+            url, {'text': 'Так себе', 'score': 4}
+        ).json()['id']
+        admin_client.post(url, {'text': 'Отлично', 'score': 10})
+        moderator_client.post(url, {'text': 'Хорошо', 'score': 8})
+        user_client.patch(f'{url}{review_id}/', {'score': 5})
+
+        response = user_client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats['count'] == 3
+        assert stats['mean'] == pytest.approx(23 / 3)
+        assert stats['median'] == 8
+        assert stats['histogram'] == {
+            str(score): int(score in (5, 8, 10)) for score in range(1, 11)
+        }
+        # A single title: the prior mean equals the title mean.
+        assert stats['weighted_rating'] == pytest.approx(23 / 3)
+
+        admin_client.delete(f'{url}{review_id}/')
+        stats = user_client.get(f'/api/v1/titles/{title.id}/stats/').json()
+        assert stats['median'] == 9
+        assert stats['histogram']['5'] == 0
+
+    def test_stats_read_one_row(self, title, client,
+                                django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/stats/'
+        assert client.get(url).json()['median'] is None
+        with django_assert_num_queries(1):
+            assert client.get(url).status_code == 200
+        assert client.get(
+            f'/api/v1/titles/{title.id + 1}/stats/'
+        ).status_code == 404
+        assert client.get('/api/v1/titles/abc/stats/').status_code == 404
@@ -0,0 +1,61 @@
+import pytest
+from django.db import transaction
+
+from core.routers import ReplicaRouter, read_from
+from reviews.models import Category
+
+URL = '/api/v1/categories/'
+
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=['default', 'replica']
+)
+
+
+@pytest.fixture
+def replicas(settings):
+    def replicas():
+        settings.DATABASE_REPLICAS = ['replica']
+    return replicas
+
+
+def get_slugs(response):
+    return [item['slug'] for item in response.json()['results']]
+
+
+def test_safe_requests_read_replica(client, replicas):
+    Category.objects.create(name='Фильмы', slug='movies')
+    replicas()
+    response = client.get(URL)
+    assert get_slugs(response) == []
+    assert 'read_primary_until' not in response.cookies
+
+
+def test_own_writes_read_primary(client, admin_client, replicas):
+    replicas()
+    response = admin_client.post(URL, {'name': 'Книги', 'slug': 'books'})
+    assert response.status_code == 201
+    assert 'read_primary_until' in response.cookies
+    assert get_slugs(admin_client.get(URL)) == ['books']
+    assert not Category.objects.using('replica').exists()
+
+
+def test_cache_miss_after_write_reads_primary(client, admin_client,
+                                              replicas, settings):
+    replicas()
+    settings.REPLICA_READ_YOUR_WRITES = 0
+    admin_client.post(URL, {'name': 'Книги', 'slug': 'books'})
+    assert get_slugs(client.get(URL)) == []
+    settings.REPLICA_READ_YOUR_WRITES = 5
+    admin_client.post(URL, {'name': 'Фильмы', 'slug': 'movies'})
+    assert get_slugs(client.get(URL)) == ['books', 'movies']
+
+
+def test_router(replicas):
+    replicas()
+    router = ReplicaRouter()
+    assert router.db_for_read(Category) == 'default'
+    with read_from('replica'):
+        assert router.db_for_read(Category) == 'replica'
+        assert router.db_for_write(Category) == 'default'
+        with transaction.atomic():
+            assert router.db_for_read(Category) == 'default'
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+from django.db import (IntegrityError, OperationalError, connection,
+                       transaction)
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import get_access_token
+from api.views import ReviewViewSet
+from reviews.models import Review
+
+THREADS = 8
+
+
+def post_review(client, url):
+    return client.post(url, {'text': 'Отзыв', 'score': 7})
+
+
+@pytest.mark.django_db
+class TestReviewUniqueness:
+
+    def test_duplicate_is_400(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert post_review(user_client, url).status_code == 201
+        response = post_review(user_client, url)
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Объект с такими параметрами уже существует!']
+        }
+        title.refresh_from_db()
+        assert title.score_count == 1, (
+            'Отклонённый отзыв не должен менять рейтинг'
+        )
+
+    def test_no_select_before_insert(self, user_client, title,
+                                     django_assert_num_queries):
+        # Title, INSERT, rating UPDATE, savepoint and its release.
+        with django_assert_num_queries(5):
+            response = post_review(
+                user_client, f'/api/v1/titles/{title.id}/reviews/'
+            )
+        assert response.status_code == 201
+
+    def test_other_integrity_errors_raised(self, title):
+        from api.serializers import ReviewSerializer
+
+        serializer = ReviewSerializer(data={'text': 'Отзыв', 'score': 7})
+        assert serializer.is_valid()
+        with pytest.raises(IntegrityError), transaction.atomic():
+            serializer.save(title=title, author=None)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_posts(user, title):
+    # Views are called directly: the test client re-raises exceptions of
+    # requests running in other threads.
+    view = ReviewViewSet.as_view({'post': 'create'})
+    factory = APIRequestFactory()
+    token = f'Bearer {get_access_token(user)}'
+    barrier = threading.Barrier(THREADS)
+    statuses = []
+
+    def send():
+        barrier.wait()
+        try:
+            # SQLite fails a writer with "locked" instead of queueing it
+            # behind a concurrent one, so such requests are resent.
+            for _ in range(100):
+                request = factory.post(
+                    f'/api/v1/titles/{title.id}/reviews/',
+                    {'text': 'Отзыв', 'score': 7},
+                    HTTP_AUTHORIZATION=token
+                )
+                try:
+                    response = view(request, title_id=title.id)
+                except OperationalError:
+                    time.sleep(0.01)
+                    continue
+                statuses.append(response.status_code)
+                return
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=send) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(statuses) == [201] + [400] * (THREADS - 1)
+    assert Review.objects.filter(title=title, author=user).count() == 1
+    title.refresh_from_db()
+    assert (title.score_count, title.score_sum) == (1, 7)
+
+
+def test_duplicate_by_postgres_constraint_name():
+    from types import SimpleNamespace
+
+    from api.serializers import is_duplicate_review
+
+    def get_error(constraint_name):
+        # psycopg2 errors carry the constraint in diag.
+        cause = Exception('duplicate key value')
+        cause.diag = SimpleNamespace(constraint_name=constraint_name)
+        error = IntegrityError(*cause.args)
+        error.__cause__ = cause
+        return error
+
+    assert is_duplicate_review(get_error('unique_title_author'))
+    assert not is_duplicate_review(get_error('reviews_review_author_id_fk'))
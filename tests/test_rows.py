@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from api.rows import RowPlan
+from api.serializers import (CommentsSerializer, ReviewSerializer,
+                             TitleReadSerializer, TitleStatsSerializer)
+from reviews.models import Comments, Review, Title
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def assert_same_json(serializer_class, queryset):
+    plan = RowPlan(serializer_class)
+    expected = render(serializer_class(queryset, many=True).data)
+    assert render(plan.serialize(plan.get_rows(queryset))) == expected
+
+
+@pytest.mark.django_db
+class TestRowPlan:
+
+    def test_titles(self, title, genres):
+        Title.objects.create(name='Без категории', year=2000)
+        rated = Title.objects.create(name='Оценённое', year=2001)
+        rated.genre.add(genres[1])
+        rated.genre.add(genres[0])
+        Title.objects.filter(pk=rated.pk).update(
+            score_sum=15, score_count=2, rating=7.5
+        )
+        assert_same_json(
+            TitleReadSerializer, Title.objects.with_related().order_by('pk')
+        )
+
+    def test_reviews_and_comments(self, user, title):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=8
+        )
+        Comments.objects.create(review=review, author=user, text='Да')
+        assert_same_json(
+            ReviewSerializer, Review.objects.select_related('author')
+        )
+        assert_same_json(
+            CommentsSerializer, Comments.objects.select_related('author')
+        )
+
+    def test_titles_list(self, client, title):
+        plan = RowPlan(TitleReadSerializer)
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'] == plan.serialize(
+            plan.get_rows(Title.objects.all())
+        )
+
+    def test_unsupported_field(self):
+        with pytest.raises(TypeError):
+            RowPlan(TitleStatsSerializer).compiled
+
+
+@pytest.mark.django_db
+def test_bench_serializers(tmp_path):
+    output = tmp_path / 'log'
+    call_command(
+        'bench_serializers', '--titles', '5', '--rounds', '1',
+        stdout=open(output, 'w')
+    )
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [line.split()[0] for line in lines] == [
+        'titles', 'reviews', 'comments'
+    ]
+    assert all('JSON совпадает' in line for line in lines)
+    assert not Title.objects.exists(), 'Данные замера должны удаляться'
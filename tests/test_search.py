@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestSearch:
+    url = '/api/v1/search/'
+
+    def search(self, client, query):
+        response = client.get(self.url, query)
+        assert response.status_code == 200
+        return response.json()['results']
+
+    def test_query_required(self, client):
+        assert client.get(self.url).status_code == 400
+        assert client.get(self.url, {'q': 'a', 'scope': 'users'}).status_code == 400
+
+    def test_titles_ranked_and_highlighted(self, client, title, category):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Зелёная миля', year=1999, category=category,
+            description='Тюремная драма по роману о побеге надежды'
+        )
+        results = self.search(client, {'q': 'побег'})
+        assert [result['name'] for result in results] == [
+            title.name, 'Зелёная миля'
+        ], 'Совпадение в названии должно быть выше совпадения в описании'
+        assert '<b>Побег</b>' in results[0]['headline']
+        assert results[0]['rank'] > results[1]['rank']
+        assert results[0]['genre'] and results[0]['category']
+
+    def test_index_follows_writes(self, client, title):
+        title.name = 'Зеленая миля'
+        title.save()
+        assert self.search(client, {'q': 'побег'}) == []
+        assert len(self.search(client, {'q': 'миля'})) == 1
+        title.delete()
+        assert self.search(client, {'q': 'миля'}) == []
+
+    def test_reviews(self, client, title, user):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=user, score=9,
+            text='Лучший фильм про надежду и дружбу'
+        )
+        results = self.search(client, {'q': 'надежду', 'scope': 'reviews'})
+        assert [result['id'] for result in results] == [review.id]
+        assert results[0]['author'] == user.username
+        assert '<b>надежду</b>' in results[0]['headline']
@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import throttling
+from api.throttling import SQLiteBucketStore, parse_rate
+
+RATES = {
+    'signup_ip': '3/hour',
+    'signup_email': '2/hour',
+    'token_ip': '3/min',
+    'token_username': '2/min',
+}
+
+
+def signup(client, email, username, ip='10.0.0.1'):
+    return client.post(
+        '/api/v1/auth/signup/',
+        {'email': email, 'username': username},
+        REMOTE_ADDR=ip
+    )
+
+
+def test_parse_rate():
+    assert parse_rate('5/min') == (5, 5 / 60)
+    assert parse_rate('10/s') == (10, 10)
+    assert parse_rate(None) is None
+
+
+@pytest.fixture
+def rates(settings):
+    settings.THROTTLE_RATES = RATES
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('rates')
+class TestAuthThrottling:
+
+    def test_signup_email_bucket(self, client):
+        for _ in range(2):
+            response = signup(client, 'bot@yamdb.fake', 'bot')
+            assert response.status_code != 429
+        response = signup(client, 'BOT@yamdb.fake', 'bot', ip='10.0.0.2')
+        assert response.status_code == 429, (
+            'Лимит по email должен действовать независимо от IP'
+        )
+        assert int(response['Retry-After']) > 0
+        response = signup(client, 'other@yamdb.fake', 'other', ip='10.0.0.2')
+        assert response.status_code != 429
+
+    def test_signup_ip_bucket(self, client):
+        for number in range(3):
+            signup(client, f'bot{number}@yamdb.fake', f'bot{number}')
+        response = signup(client, 'bot9@yamdb.fake', 'bot9')
+        assert response.status_code == 429
+
+    def test_spoofed_forwarded_for(self, client):
+        # nginx appends the address it sees to what the client sent.
+        for number in range(4):
+            response = client.post(
+                '/api/v1/auth/signup/',
+                {'email': f'bot{number}@yamdb.fake',
+                 'username': f'bot{number}'},
+                HTTP_X_FORWARDED_FOR=f'192.168.0.{number}, 10.0.0.1',
+                REMOTE_ADDR='172.18.0.5'
+            )
+        assert response.status_code == 429, (
+            'Подделанный X-Forwarded-For не должен давать новый лимит'
+        )
+
+    def test_throttled_token_request_skips_database(self, client, user):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            client.post('/api/v1/auth/token/', data)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/token/', data)
+        assert response.status_code == 429
+        assert len(context.captured_queries) == 0
+
+    def test_counters(self, client):
+        before = throttling.get_stats()
+        for _ in range(3):
+            signup(client, 'bot@yamdb.fake', 'bot')
+        stats = throttling.get_stats()
+        throttled = ('signup_email', 'throttled')
+        assert stats[throttled] - before.get(throttled, 0) == 1
+
+
+@pytest.mark.django_db
+def test_disabled_rates(client, settings):
+    settings.THROTTLE_RATES = {}
+    for _ in range(30):
+        response = signup(client, 'bot@yamdb.fake', 'bot')
+    assert response.status_code != 429
+
+
+def test_sqlite_store_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'buckets.sqlite3')
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    rate = parse_rate('2/hour')
+    assert first.consume('key', *rate) == 0
+    assert second.consume('key', *rate) == 0
+    assert first.consume('key', *rate) > 0
+    assert second.consume('other', *rate) == 0
+    first.clear()
+    assert second.consume('key', *rate) == 0